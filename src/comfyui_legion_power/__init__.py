@@ -1,10 +1,14 @@
 from .nodes.legion_config import LegionConfigNode
 from .nodes.legion_master import LegionMasterNode, LegionMasterNode3, LegionMasterNode6
 from .nodes.legion_warmup import LegionWarmupNode
+from .nodes.legion_master_batch import LegionMasterBatchNode
+from .nodes.legion_map import LegionMapNode
 from .nodes.legion_join import LegionJoinNode
 from .nodes.legion_join_all import LegionJoinAllNode
 from .nodes.legion_exporter import LegionExporterNode
 from .nodes.legion_importer import LegionImporterNode
+from .helpers.worker_manager import LegionWorkerManager
+from .helpers.status_api import register_status_routes
 
 NODE_CLASS_MAPPINGS = {
     "LegionConfig": LegionConfigNode,
@@ -12,6 +16,8 @@ NODE_CLASS_MAPPINGS = {
     "LegionMaster3": LegionMasterNode3,
     "LegionMaster6": LegionMasterNode6,
     "LegionMaster": LegionMasterNode,
+    "LegionMasterBatch": LegionMasterBatchNode,
+    "LegionMap": LegionMapNode,
     "LegionJoin": LegionJoinNode,
     "LegionJoinAll": LegionJoinAllNode,
     "LegionExporter": LegionExporterNode,
@@ -24,12 +30,22 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "LegionMaster3": "Legion: Master (3 channels)",
     "LegionMaster6": "Legion: Master (6 channels)",
     "LegionMaster": "Legion: Master (12 channels)",
+    "LegionMasterBatch": "Legion: Master (batch)",
+    "LegionMap": "Legion: Map",
     "LegionJoin": "Legion: Join Campaign",
     "LegionJoinAll": "Legion: Join All Campaigns",
     "LegionExporter": "Legion: Exporter",
     "LegionImporter": "Legion: Importer",
 }
 
+# Workers launched by a Master load this plugin as well: only the Master starts workers and serves the status API
+if not LegionWorkerManager.is_worker_process():
+    # Start the workers listed under 'warm_pool' in config.yaml while ComfyUI finishes loading
+    LegionWorkerManager.start_warm_pool()
+
+    # Campaign progress, workers and connections for monitoring: GET /legion/status
+    register_status_routes()
+
 # Messaggio di log aggiornato
 #print("------------------------------------------")
 #print("ComfyUI-LegionPower: Custom nodes loaded successfully.")
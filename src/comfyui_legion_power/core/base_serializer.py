@@ -6,6 +6,19 @@ class BaseSerializer(ABC):
     Defines the contract for serializing (saving) and deserializing (loading) data.
     """
 
+    # Optional data exchange format this serializer implements (e.g. "shm").
+    # Serializers with a FORMAT are only selected when a campaign asks for that format,
+    # serializers without one are always eligible.
+    FORMAT = None
+
+    # Keys of the data exchange options that change what this serializer writes (e.g. "npy_dtype").
+    # Payloads serialized with the same values are interchangeable (see LegionBlobStore).
+    OPTIONS = ()
+
+    def __init__(self, options=None):
+        # Per-campaign data exchange options (the 'data_exchange' section of a legion config)
+        self.options = options or {}
+
     @staticmethod
     @abstractmethod
     def can_handle(data) -> bool:
@@ -32,4 +45,17 @@ class BaseSerializer(ABC):
         Deserializes data from a source.
         For file-based serializers, this is a file path.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def get_manifest_meta(self) -> dict:
+        """
+        Returns JSON-safe metadata about the last serialized payload.
+        It is stored under 'meta' in the manifest entry and handed back to deserialize_entry().
+        """
+        return {}
+
+    def deserialize_entry(self, source_path: str, meta: dict):
+        """
+        Deserializes a manifest entry. Serializers that need their manifest metadata override this.
+        """
+        return self.deserialize(source_path)
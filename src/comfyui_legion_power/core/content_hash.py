@@ -0,0 +1,100 @@
+# src/comfyui_legion_power/core/content_hash.py
+import hashlib
+import json
+
+import numpy as np
+import torch
+
+# xxHash (XXH3, 128 bits) hashes several times faster than SHA-256. Without the package,
+# SHA-256: with CPU SHA extensions it beats BLAKE2b, and it is what hashlib does fastest
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+JSON_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class UnhashableData(TypeError):
+    """Raised for data whose content cannot be hashed (e.g. model objects)."""
+
+
+def _update(hasher, data):
+    # Every value is tagged with its kind, so e.g. a list and a tuple of the same items differ
+    if isinstance(data, torch.Tensor):
+        tensor = data.detach().cpu().contiguous()
+        hasher.update(f"tensor:{tensor.dtype}:{tuple(tensor.shape)}:".encode())
+        # Hash the raw bytes: viewing them as uint8 works for every dtype (bfloat16 included)
+        hasher.update(tensor.reshape(-1).view(torch.uint8).numpy().data)
+    elif isinstance(data, np.ndarray):
+        array = np.ascontiguousarray(data)
+        hasher.update(f"ndarray:{array.dtype.str}:{array.shape}:".encode())
+        hasher.update(array.data)
+    elif isinstance(data, (bytes, bytearray)):
+        hasher.update(f"bytes:{len(data)}:".encode())
+        hasher.update(data)
+    elif isinstance(data, JSON_PRIMITIVES):
+        hasher.update(f"{type(data).__name__}:{json.dumps(data)};".encode())
+    elif isinstance(data, (list, tuple)):
+        hasher.update(f"{type(data).__name__}:{len(data)}[".encode())
+        for item in data:
+            _update(hasher, item)
+        hasher.update(b"]")
+    elif isinstance(data, dict):
+        hasher.update(f"dict:{len(data)}{{".encode())
+        for key in sorted(data, key=str):
+            _update(hasher, key)
+            _update(hasher, data[key])
+        hasher.update(b"}")
+    else:
+        raise UnhashableData(f"Cannot hash data of type {type(data).__name__}")
+
+
+def _new_hasher():
+    return xxhash.xxh3_128() if xxhash is not None else hashlib.sha256()
+
+
+def hash_data(data) -> str:
+    """
+    Returns a hex digest of the content of 'data': tensors, numpy arrays, bytes,
+    JSON primitives, and lists/tuples/dicts of those. Equal content gives an equal digest,
+    whatever the object identity or memory layout. Raises UnhashableData for other types.
+    """
+    hasher = _new_hasher()
+    _update(hasher, data)
+    return hasher.hexdigest()
+
+
+def hash_json(data) -> str:
+    """Returns a hex digest of a JSON-serializable value, independent of dict order."""
+    hasher = _new_hasher()
+    hasher.update(json.dumps(data, sort_keys=True).encode())
+    return hasher.hexdigest()
+
+
+class InputHashes:
+    """
+    Content digests of a campaign's inputs (name -> data), each computed at most once and only
+    when first asked for. One instance is shared by everything that needs them (result cache
+    key, content-addressed directory, blob store), so a large batch is hashed a single time.
+    """
+
+    def __init__(self, inputs: dict):
+        self.inputs = inputs
+        self._digests = {} # name -> digest, or the UnhashableData raised for it
+
+    def get(self, name) -> str:
+        """Digest of one input. Raises UnhashableData if its content cannot be hashed."""
+        if name not in self._digests:
+            try:
+                self._digests[name] = hash_data(self.inputs[name])
+            except UnhashableData as e:
+                self._digests[name] = e
+        digest = self._digests[name]
+        if isinstance(digest, UnhashableData):
+            raise digest
+        return digest
+
+    def all(self) -> dict:
+        """{name: digest} of every input. Raises UnhashableData if any input cannot be hashed."""
+        return {name: self.get(name) for name in self.inputs}
@@ -51,8 +51,19 @@ class LegionCampaign:
         self.status = status
         self.outputs = {} # dict mapping here_arg_name to its future file path
 
+        # Data exchange directory of the campaign, set by the Master (see LegionFileManager)
+        self.run_path = None
+
         # This will hold the final resolved port after 'auto' is handled
         self.resolved_port = None
+        # True while the campaign is counted as in flight on that worker (see LegionWorkerManager.release_worker)
+        self.holds_worker = False
+
+        # Future of the remote execution, set when the campaign is handed to the campaign engine
+        self.future = None
+        self.error = None
+        # CampaignProgress fed by the worker's events while the engine runs the campaign
+        self.progress = None
 
     def __repr__(self):
         return f"LegionCampaign(id={self.campaign_id}, status={self.status}, port={self.resolved_port})"
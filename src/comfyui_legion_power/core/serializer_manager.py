@@ -1,23 +1,160 @@
 # src/comfyui_legion_power/core/serializer_manager.py
+import json
+import os
+from pathlib import Path
 
 from .serializers.primitive_serializer import PrimitiveSerializer
 from .serializers.image_serializer import ImageSerializer
 from .serializers.image_batch_serializer import ImageBatchSerializer
+from .serializers.shared_memory_serializer import SharedMemorySerializer
+from .serializers.npy_batch_serializer import NpyBatchSerializer
+from .serializers.mask_serializer import MaskSerializer
+from .serializers.audio_serializer import AudioSerializer
+from .serializers.latent_serializer import LatentSerializer
+from .serializers.conditioning_serializer import ConditioningSerializer
+from .serializers.chunked_serializer import ChunkedSerializer
 
 # A list of all available serializer classes.
 # The order is important: more specific handlers should come first.
+# Serializers with a FORMAT are opt-in and only considered when a campaign requests that format.
 SERIALIZER_CLASSES = [
+    SharedMemorySerializer,
+    NpyBatchSerializer,
     ImageBatchSerializer,
     ImageSerializer,
+    MaskSerializer,
+    AudioSerializer,
+    LatentSerializer,
+    ConditioningSerializer,
+    ChunkedSerializer,
     PrimitiveSerializer,
 ]
 
-def get_serializer_for_data(data):
+INPUT_MANIFEST_NAME = "manifest_input.json"
+OUTPUT_MANIFEST_NAME = "manifest_output.json"
+EXCHANGE_OPTIONS_NAME = "exchange_options.json"
+# One JSON line per output chunk, appended while the Exporter is still writing (see ChunkedSerializer)
+PARTIAL_MANIFEST_NAME = "manifest_partial.jsonl"
+
+def get_serializer_for_data(data, options=None):
     """
     Finds and returns an instance of the appropriate serializer for the given data.
+    'options' are the campaign's data exchange options (e.g. {"format": "shm"}).
     """
+    options = options or {}
+    requested_format = options.get("format")
+
     for serializer_class in SERIALIZER_CLASSES:
+        if serializer_class.FORMAT is not None and serializer_class.FORMAT != requested_format:
+            continue
         if serializer_class.can_handle(data):
-            return serializer_class() # Return an instance of the class
+            return serializer_class(options) # Return an instance of the class
+
+    return None # No suitable serializer found
+
+def get_serializer_for_type(type_name):
+    """
+    Returns an instance of the serializer registered under TYPE_NAME, or None.
+    """
+    for serializer_class in SERIALIZER_CLASSES:
+        if serializer_class.TYPE_NAME == type_name:
+            return serializer_class()
+    return None
+
+def serialize_to_manifest_entry(serializer, data, destination_path, relative_path: str) -> dict:
+    """
+    Serializes 'data' and returns the manifest entry describing it.
+    'relative_path' is stored for file-based types, relative to the manifest's directory.
+    """
+    value = serializer.serialize(data, destination_path)
+    entry = {"type": getattr(serializer, 'TYPE_NAME', 'unknown')}
+
+    if getattr(serializer, 'IS_PRIMITIVE', False):
+        entry["value"] = value
+    else:
+        entry["path"] = relative_path
+
+    meta = serializer.get_manifest_meta()
+    if meta:
+        entry["meta"] = meta
+
+    return entry
+
+def deserialize_manifest(manifest: dict, base_path: Path, log_prefix: str = "[LegionPower]") -> dict:
+    """
+    Deserializes every entry of a manifest. File-based entries are resolved against 'base_path'.
+    Returns a dict mapping entry names to their deserialized data.
+    """
+    deserialized = {}
+
+    for name, info in manifest.items():
+        serializer_type = info.get("type")
+        deserializer = get_serializer_for_type(serializer_type)
+
+        if deserializer is None:
+            print(f"{log_prefix} WARNING: Unknown serializer type '{serializer_type}' for '{name}'. Skipping.")
+            continue
+
+        if "value" in info:
+            # Primitive type, the value is in the manifest itself
+            deserialized[name] = deserializer.deserialize(info["value"])
+            print(f"{log_prefix}  - Deserialized primitive '{name}': {deserialized[name]}")
+        elif "path" in info:
+            # File-based type
+            source_path = (Path(base_path) / info["path"]).resolve()
+            deserialized[name] = deserializer.deserialize_entry(str(source_path), info.get("meta", {}))
+            print(f"{log_prefix}  - Deserialized '{name}' from path: {source_path}")
+
+    return deserialized
+
+def read_manifest(manifest_path: Path) -> dict:
+    """Loads a manifest file, returning an empty dict if it does not exist."""
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_manifest(manifest_path: Path, manifest: dict):
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+def append_manifest_line(manifest_path: Path, record: dict):
+    """
+    Appends one JSON line to a partial manifest with a single O_APPEND write,
+    so a concurrent reader sees either the whole line or nothing of it.
+    """
+    line = (json.dumps(record) + "\n").encode('utf-8')
+    fd = os.open(manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+def read_manifest_lines(manifest_path: Path, offset: int = 0):
+    """
+    Reads the complete lines of a partial manifest from byte 'offset' on.
+    Returns (records, new offset); a line still being written is left for the next call.
+    """
+    try:
+        with open(manifest_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b"\n") + 1
+    records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return records, offset + end
+
+def save_exchange_options(run_path: Path, options: dict):
+    """
+    Stores the campaign's data exchange options next to its inputs,
+    so the worker's Exporter serializes the outputs the same way.
+    """
+    write_manifest(Path(run_path) / EXCHANGE_OPTIONS_NAME, options or {})
 
-    return None # No suitable serializer found
\ No newline at end of file
+def load_exchange_options(run_path: Path) -> dict:
+    return read_manifest(Path(run_path) / EXCHANGE_OPTIONS_NAME)
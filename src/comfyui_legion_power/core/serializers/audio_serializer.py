@@ -0,0 +1,105 @@
+# src/comfyui_legion_power/core/serializers/audio_serializer.py
+import torch
+import numpy as np
+from pathlib import Path
+from ..base_serializer import BaseSerializer
+
+PCM_FILENAME = "audio.pcm"
+SAMPLE_FORMATS = {"float32": np.float32, "int16": np.int16}
+INT16_SCALE = 32767.0
+
+
+class AudioSerializer(BaseSerializer):
+    """
+    Handles ComfyUI AUDIO dicts ({"waveform": [B, C, T] tensor, "sample_rate": int}).
+
+    The waveform is written as raw interleaved PCM ([B, T, C] frames), float32 (default) or int16
+    ('data_exchange.audio_sample_format'). Sample rate and channel layout go in the manifest.
+
+    Optimizations:
+    - No WAV container and no extra nodes in the graphs
+    - The receiving side decodes from a memory mapping straight into the final [B, C, T] tensor
+      in one pass, and drops the mapping (the run directory stays deletable)
+    """
+    TYPE_NAME = "audio_pcm"
+    IS_PRIMITIVE = False
+    IS_BATCH = True
+    OPTIONS = ("audio_sample_format",)
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self._meta = {}
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        return (
+            isinstance(data, dict)
+            and isinstance(data.get("waveform"), torch.Tensor)
+            and data["waveform"].ndim == 3
+            and isinstance(data.get("sample_rate"), int)
+        )
+
+    def serialize(self, data: dict, destination_path: str):
+        dir_path = Path(destination_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        sample_format = self.options.get("audio_sample_format", "float32")
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported data_exchange.audio_sample_format '{sample_format}'. Use one of: {', '.join(SAMPLE_FORMATS)}")
+
+        waveform = data["waveform"].detach().cpu()
+        batch, channels, frames = waveform.shape
+
+        # [B, C, T] -> [B, T, C]: interleaved channels, one contiguous copy
+        interleaved = waveform.transpose(1, 2)
+        if sample_format == "int16":
+            interleaved = (interleaved.clamp(-1, 1) * INT16_SCALE).round_().to(torch.int16)
+        else:
+            interleaved = interleaved.to(torch.float32)
+        interleaved = interleaved.contiguous()
+
+        filepath = dir_path / PCM_FILENAME
+        with open(filepath, 'wb') as f:
+            f.write(interleaved.numpy())
+
+        self._meta = {
+            "sample_rate": data["sample_rate"],
+            "sample_format": sample_format,
+            "layout": "interleaved",
+            "batch": batch,
+            "channels": channels,
+            "frames": frames,
+        }
+        print(f"[LegionPower] Serialized audio ({batch}x{channels}ch, {frames} frames @ {data['sample_rate']} Hz, {sample_format}) to {filepath}")
+        return str(dir_path.resolve())
+
+    def get_manifest_meta(self) -> dict:
+        return self._meta
+
+    def deserialize(self, source_path: str):
+        raise ValueError("Audio can only be deserialized from a manifest entry (sample rate and layout missing).")
+
+    def deserialize_entry(self, source_path: str, meta: dict):
+        filepath = Path(source_path) / PCM_FILENAME
+
+        if not filepath.exists():
+            raise FileNotFoundError(f"Cannot deserialize audio, file not found: {filepath}")
+        if not meta or "sample_rate" not in meta:
+            raise ValueError(f"Manifest entry for audio at '{source_path}' has no PCM metadata.")
+
+        shape = (meta["batch"], meta["frames"], meta["channels"])
+        if 0 in shape:
+            return {"waveform": torch.zeros((meta["batch"], meta["channels"], meta["frames"])), "sample_rate": meta["sample_rate"]}
+
+        pcm = np.memmap(filepath, dtype=SAMPLE_FORMATS[meta["sample_format"]], mode='r', shape=shape)
+
+        # Decode the [B, T, C] mapping straight into a [B, C, T] tensor; nothing keeps the file open
+        # afterwards, so the run directory can be removed (Windows refuses to delete a mapped file)
+        waveform = torch.empty((meta["batch"], meta["channels"], meta["frames"]), dtype=torch.float32)
+        if meta["sample_format"] == "float32":
+            np.copyto(waveform.numpy(), pcm.transpose(0, 2, 1))
+        else:
+            np.divide(pcm.transpose(0, 2, 1), np.float32(INT16_SCALE), out=waveform.numpy())
+        del pcm # Release the mapping
+
+        return {"waveform": waveform, "sample_rate": meta["sample_rate"]}
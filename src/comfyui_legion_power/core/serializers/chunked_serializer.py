@@ -0,0 +1,80 @@
+# src/comfyui_legion_power/core/serializers/chunked_serializer.py
+import torch
+from pathlib import Path
+from ..base_serializer import BaseSerializer
+
+
+class ChunkedSerializer(BaseSerializer):
+    """
+    Wraps a batch serializer (one with CHUNKABLE = True) to write a long batch as a sequence
+    of chunks of 'data_exchange.chunk_size' frames: <name>/chunk_00000, chunk_00001, ...
+
+    Every chunk is announced by appending one line to the partial manifest as soon as it is
+    on disk, so the other side can decode it while the following chunks are still being
+    written (see ChunkCollector). The final manifest entry lists all chunks.
+
+    Never picked automatically: the Exporter opts in when the campaign sets a chunk size.
+    """
+    TYPE_NAME = "chunked"
+    IS_PRIMITIVE = False
+    IS_BATCH = True
+
+    def __init__(self, options=None, inner=None, chunk_size=0, partial_manifest_path=None, name=None):
+        super().__init__(options)
+        self.inner = inner
+        self.chunk_size = chunk_size
+        self.partial_manifest_path = partial_manifest_path
+        self.name = name
+        self._chunks = []
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        return False
+
+    def serialize(self, data: torch.Tensor, destination_path: str):
+        from ..serializer_manager import append_manifest_line
+
+        dir_path = Path(destination_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        self._chunks = []
+        for index, start in enumerate(range(0, data.shape[0], self.chunk_size)):
+            chunk = data[start:start + self.chunk_size]
+            chunk_name = f"chunk_{index:05d}"
+
+            # A fresh inner serializer per chunk: its manifest meta describes that chunk only
+            inner = type(self.inner)(self.options)
+            inner.serialize(chunk, str(dir_path / chunk_name))
+
+            record = {"type": inner.TYPE_NAME, "path": chunk_name, "frames": int(chunk.shape[0])}
+            meta = inner.get_manifest_meta()
+            if meta:
+                record["meta"] = meta
+            self._chunks.append(record)
+
+            if self.partial_manifest_path is not None:
+                append_manifest_line(self.partial_manifest_path, {"name": self.name, "index": index, "dir": dir_path.name, **record})
+
+        print(f"[LegionPower] Serialized {data.shape[0]} frames in {len(self._chunks)} chunk(s) to {dir_path}")
+        return str(dir_path.resolve())
+
+    def get_manifest_meta(self) -> dict:
+        return {"chunks": self._chunks}
+
+    def deserialize(self, source_path: str):
+        raise ValueError("Chunked data can only be deserialized from a manifest entry (chunk list missing).")
+
+    @staticmethod
+    def deserialize_chunk(source_path, record: dict):
+        """Decodes one chunk described by a partial manifest line or a 'chunks' item."""
+        from ..serializer_manager import get_serializer_for_type
+
+        inner = get_serializer_for_type(record["type"])
+        if inner is None:
+            raise ValueError(f"Unknown serializer type '{record['type']}' for chunk {record['path']}")
+        return inner.deserialize_entry(str(source_path), record.get("meta", {}))
+
+    def deserialize_entry(self, source_path: str, meta: dict):
+        dir_path = Path(source_path)
+        chunks = [self.deserialize_chunk(dir_path / record["path"], record) for record in meta["chunks"]]
+        return torch.cat(chunks, dim=0)
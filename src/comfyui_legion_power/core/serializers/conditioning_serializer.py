@@ -0,0 +1,24 @@
+# src/comfyui_legion_power/core/serializers/conditioning_serializer.py
+import torch
+from .tensor_tree_serializer import TensorTreeSerializer, is_tensor_tree
+
+
+class ConditioningSerializer(TensorTreeSerializer):
+    """
+    Handles ComfyUI CONDITIONING lists ([[cond_tensor, {"pooled_output": tensor, ...}], ...]).
+    Entries holding non-serializable objects (e.g. ControlNet models) are not supported.
+    """
+    TYPE_NAME = "conditioning"
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        if not isinstance(data, list) or not data:
+            return False
+
+        for item in data:
+            if not (isinstance(item, (list, tuple)) and len(item) == 2):
+                return False
+            if not (isinstance(item[0], torch.Tensor) and isinstance(item[1], dict)):
+                return False
+
+        return is_tensor_tree(data)
@@ -0,0 +1,19 @@
+# src/comfyui_legion_power/core/serializers/latent_serializer.py
+import torch
+from .tensor_tree_serializer import TensorTreeSerializer, is_tensor_tree
+
+
+class LatentSerializer(TensorTreeSerializer):
+    """
+    Handles ComfyUI LATENT dicts ({"samples": tensor, optional "noise_mask", "batch_index", ...}).
+    Lets workers start from (or return) latents instead of decoded pixels.
+    """
+    TYPE_NAME = "latent"
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        return (
+            isinstance(data, dict)
+            and isinstance(data.get("samples"), torch.Tensor)
+            and is_tensor_tree(data)
+        )
@@ -0,0 +1,70 @@
+# src/comfyui_legion_power/core/serializers/npy_batch_serializer.py
+import torch
+import numpy as np
+from pathlib import Path
+from ..base_serializer import BaseSerializer
+
+NPY_FILENAME = "frames.npy"
+SUPPORTED_DTYPES = ("uint8", "float16")
+
+
+class NpyBatchSerializer(BaseSerializer):
+    """
+    Handles a batch of images in a single torch.Tensor.
+    Serializes the whole batch into ONE contiguous .npy file instead of a PNG per frame.
+
+    Optimizations:
+    - Quantization (uint8) or down-cast (float16) is a single vectorized pass over the batch
+    - The reader memory-maps the file and decodes it straight into the output tensor:
+      one sequential read, no per-frame file opens and no torch.stack copy
+    """
+    TYPE_NAME = "image_batch_npy"
+    IS_PRIMITIVE = False
+    IS_BATCH = True
+    CHUNKABLE = True # Slices along the batch dimension serialize independently (see ChunkedSerializer)
+    FORMAT = "npy"
+    OPTIONS = ("npy_dtype",)
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        # Same shape contract as ImageBatchSerializer: [B, H, W, C] with B >= 1
+        return isinstance(data, torch.Tensor) and data.ndim == 4 and data.shape[0] >= 1
+
+    def serialize(self, data: torch.Tensor, destination_path: str):
+        dir_path = Path(destination_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        dtype = self.options.get("npy_dtype", "uint8")
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported data_exchange.npy_dtype '{dtype}'. Use one of: {', '.join(SUPPORTED_DTYPES)}")
+
+        tensor = data.detach().cpu()
+        if dtype == "uint8":
+            # Same math as the PNG path (scale, clip, truncate), on the whole batch at once
+            array = (tensor * 255.).clamp_(0, 255).to(torch.uint8).numpy()
+        else:
+            array = tensor.to(torch.float16).contiguous().numpy()
+
+        filepath = dir_path / NPY_FILENAME
+        np.save(filepath, array, allow_pickle=False)
+
+        print(f"[LegionPower] Serialized image batch of {len(data)} images ({dtype}) to {filepath}")
+        return str(dir_path.resolve())
+
+    def deserialize(self, source_path: str):
+        filepath = Path(source_path) / NPY_FILENAME
+
+        if not filepath.exists():
+            raise FileNotFoundError(f"Cannot deserialize image batch, file not found: {filepath}")
+
+        frames = np.load(filepath, mmap_mode='r', allow_pickle=False)
+
+        # Decode straight from the mapping into the final float32 tensor
+        batch = torch.empty(frames.shape, dtype=torch.float32)
+        if frames.dtype == np.uint8:
+            np.divide(frames, np.float32(255.0), out=batch.numpy())
+        else:
+            np.copyto(batch.numpy(), frames, casting='unsafe')
+
+        del frames # Release the mapping
+        return batch
@@ -0,0 +1,168 @@
+# src/comfyui_legion_power/core/serializers/shared_memory_serializer.py
+import atexit
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import uuid
+from pathlib import Path
+
+import torch
+from ..base_serializer import BaseSerializer
+
+# POSIX shared memory is exposed as a tmpfs on /dev/shm. Where it does not exist (e.g. Windows)
+# we fall back to the system temp directory: still a raw mmap, just not RAM-backed.
+SHM_ROOT = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+
+# Windows refuses to delete a file that is still mapped (by us or by the worker), and a tensor
+# built on a mapping keeps it for as long as it lives: there, segments are read instead of mapped
+MAP_SEGMENTS = os.name != "nt"
+PENDING_UNLINKS = set() # segments that could not be deleted yet (still open elsewhere), retried later
+
+SEGMENT_PREFIX = "legion_"
+SEGMENT_NAME_PATTERN = re.compile(r"^legion_[0-9a-f]{32}$")
+
+# Segment layout: MAGIC | uint32 header length | JSON header | padding | raw tensor bytes
+HEADER_MAGIC = b"LGNSHM01"
+HEADER_LEN_FORMAT = "<I"
+DATA_ALIGNMENT = 64
+
+
+def _data_offset(header_len: int) -> int:
+    raw_offset = len(HEADER_MAGIC) + struct.calcsize(HEADER_LEN_FORMAT) + header_len
+    return (raw_offset + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+
+class SharedMemorySerializer(BaseSerializer):
+    """
+    Handles any torch.Tensor by copying its raw bytes into a named shared memory segment.
+
+    Optimizations:
+    - No float -> uint8 -> PNG round-trip: the tensor keeps its dtype and precision
+    - The reader maps the segment copy-on-write and builds the tensor straight from that buffer
+
+    The segment name is stored in the manifest; LegionFileManager.cleanup() unlinks it.
+    Only usable when Master and worker share the same host.
+    """
+    TYPE_NAME = "tensor_shm"
+    IS_PRIMITIVE = False
+    IS_BATCH = True
+    FORMAT = "shm"
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self._segment = None
+
+    @staticmethod
+    def can_handle(data) -> bool:
+        return isinstance(data, torch.Tensor)
+
+    def serialize(self, data: torch.Tensor, destination_path: str):
+        tensor = data.detach().cpu().contiguous()
+        segment = f"{SEGMENT_PREFIX}{uuid.uuid4().hex}"
+
+        header = json.dumps({
+            "dtype": str(tensor.dtype).replace("torch.", ""),
+            "shape": list(tensor.shape),
+            "strides": list(tensor.stride()),
+        }).encode("utf-8")
+        offset = _data_offset(len(header))
+
+        with open(SHM_ROOT / segment, "wb") as f:
+            f.write(HEADER_MAGIC)
+            f.write(struct.pack(HEADER_LEN_FORMAT, len(header)))
+            f.write(header)
+            f.write(b"\0" * (offset - f.tell()))
+            if tensor.numel() > 0:
+                # Reinterpret as bytes so dtypes numpy doesn't know (e.g. bfloat16) are written as-is
+                f.write(tensor.reshape(-1).view(torch.uint8).numpy())
+
+        self._segment = segment
+        print(f"[LegionPower] Serialized tensor {tuple(tensor.shape)} ({tensor.dtype}) to shared memory segment {segment}")
+        return segment
+
+    def get_manifest_meta(self) -> dict:
+        return {"shm_segment": self._segment}
+
+    def deserialize(self, source_path: str):
+        raise ValueError("Shared memory tensors can only be deserialized from a manifest entry (segment name missing).")
+
+    def deserialize_entry(self, source_path: str, meta: dict):
+        segment = (meta or {}).get("shm_segment")
+        if not segment:
+            raise ValueError(f"Manifest entry for '{source_path}' has no shared memory segment.")
+        return SharedMemorySerializer.load_segment(segment)
+
+    @staticmethod
+    def _segment_path(segment: str) -> Path:
+        # The name comes from a manifest on disk: never let it point outside SHM_ROOT
+        if not SEGMENT_NAME_PATTERN.match(segment):
+            raise ValueError(f"Invalid shared memory segment name: '{segment}'")
+        return SHM_ROOT / segment
+
+    @staticmethod
+    def load_segment(segment: str) -> torch.Tensor:
+        """
+        Maps a segment and returns a tensor backed directly by the mapping (no copy).
+        """
+        segment_path = SharedMemorySerializer._segment_path(segment)
+        if not segment_path.exists():
+            raise FileNotFoundError(f"Shared memory segment not found: {segment_path}")
+
+        with open(segment_path, "rb") as f:
+            if MAP_SEGMENTS:
+                # ACCESS_COPY: private copy-on-write mapping, so consumers may modify the tensor
+                # without touching the segment. The mapping outlives the file descriptor (and an unlink).
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            else:
+                buffer = bytearray(f.read()) # Nothing left open: the segment can be deleted after the run
+
+        if buffer[:len(HEADER_MAGIC)] != HEADER_MAGIC:
+            raise ValueError(f"Segment {segment} is not a LegionPower shared memory tensor.")
+
+        (header_len,) = struct.unpack_from(HEADER_LEN_FORMAT, buffer, len(HEADER_MAGIC))
+        header_start = len(HEADER_MAGIC) + struct.calcsize(HEADER_LEN_FORMAT)
+        header = json.loads(buffer[header_start:header_start + header_len].decode("utf-8"))
+
+        dtype = getattr(torch, header["dtype"])
+        shape = header["shape"]
+        numel = math.prod(shape)
+
+        if numel == 0:
+            return torch.empty(shape, dtype=dtype)
+
+        flat = torch.frombuffer(buffer, dtype=dtype, count=numel, offset=_data_offset(header_len))
+        return flat.as_strided(shape, header["strides"])
+
+    @staticmethod
+    def unlink_segment(segment: str) -> bool:
+        """
+        Deletes a segment; returns False if it was already gone. A segment still open elsewhere
+        (Windows refuses to delete it) is kept in PENDING_UNLINKS and retried on later calls and at exit.
+        """
+        SharedMemorySerializer._retry_pending_unlinks()
+        try:
+            SharedMemorySerializer._segment_path(segment).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except PermissionError:
+            if not PENDING_UNLINKS:
+                atexit.register(SharedMemorySerializer._retry_pending_unlinks)
+            PENDING_UNLINKS.add(segment)
+            print(f"[LegionPower] WARNING: Shared memory segment {segment} is still in use, it will be deleted later")
+            return False
+
+    @staticmethod
+    def _retry_pending_unlinks():
+        for segment in list(PENDING_UNLINKS):
+            try:
+                SharedMemorySerializer._segment_path(segment).unlink()
+            except PermissionError:
+                continue
+            except FileNotFoundError:
+                pass
+            PENDING_UNLINKS.discard(segment)
@@ -0,0 +1,97 @@
+# src/comfyui_legion_power/core/serializers/tensor_tree_serializer.py
+import torch
+from pathlib import Path
+from safetensors.torch import save_file, load_file
+from ..base_serializer import BaseSerializer
+
+SAFETENSORS_FILENAME = "tensors.safetensors"
+JSON_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def is_tensor_tree(data) -> bool:
+    """
+    True if 'data' is made only of tensors, JSON primitives, lists, tuples and str-keyed dicts.
+    """
+    if isinstance(data, (torch.Tensor,) + JSON_PRIMITIVES):
+        return True
+    if isinstance(data, (list, tuple)):
+        return all(is_tensor_tree(item) for item in data)
+    if isinstance(data, dict):
+        return all(isinstance(key, str) and is_tensor_tree(value) for key, value in data.items())
+    return False
+
+
+class TensorTreeSerializer(BaseSerializer):
+    """
+    Base class for structured ComfyUI types (dicts/lists holding tensors).
+
+    All tensors go into a single safetensors file; the structure around them
+    (keys, lists, tuples and non-tensor values) goes into the manifest 'meta'.
+    """
+    IS_PRIMITIVE = False
+    IS_BATCH = True
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self._tree = None
+
+    def _flatten(self, data, tensors: dict, storages: set):
+        if isinstance(data, torch.Tensor):
+            tensor = data.detach().cpu().contiguous()
+            # safetensors refuses tensors sharing memory (e.g. views of the same latent)
+            storage_ptr = tensor.untyped_storage().data_ptr()
+            if storage_ptr in storages:
+                tensor = tensor.clone()
+            storages.add(storage_ptr)
+
+            key = f"t{len(tensors)}"
+            tensors[key] = tensor
+            return {"__tensor__": key}
+        if isinstance(data, tuple):
+            return {"__tuple__": [self._flatten(item, tensors, storages) for item in data]}
+        if isinstance(data, list):
+            return [self._flatten(item, tensors, storages) for item in data]
+        if isinstance(data, dict):
+            return {"__dict__": {key: self._flatten(value, tensors, storages) for key, value in data.items()}}
+        return data
+
+    def _unflatten(self, node, tensors: dict):
+        if isinstance(node, list):
+            return [self._unflatten(item, tensors) for item in node]
+        if isinstance(node, dict):
+            if "__tensor__" in node:
+                return tensors[node["__tensor__"]]
+            if "__tuple__" in node:
+                return tuple(self._unflatten(item, tensors) for item in node["__tuple__"])
+            return {key: self._unflatten(value, tensors) for key, value in node["__dict__"].items()}
+        return node
+
+    def serialize(self, data, destination_path: str):
+        dir_path = Path(destination_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+        tensors = {}
+        self._tree = self._flatten(data, tensors, set())
+
+        filepath = dir_path / SAFETENSORS_FILENAME
+        save_file(tensors, str(filepath))
+
+        print(f"[LegionPower] Serialized {self.TYPE_NAME} ({len(tensors)} tensors) to {filepath}")
+        return str(dir_path.resolve())
+
+    def get_manifest_meta(self) -> dict:
+        return {"tree": self._tree}
+
+    def deserialize(self, source_path: str):
+        raise ValueError(f"{self.TYPE_NAME} can only be deserialized from a manifest entry (structure missing).")
+
+    def deserialize_entry(self, source_path: str, meta: dict):
+        filepath = Path(source_path) / SAFETENSORS_FILENAME
+
+        if not filepath.exists():
+            raise FileNotFoundError(f"Cannot deserialize {self.TYPE_NAME}, file not found: {filepath}")
+        if not meta or "tree" not in meta:
+            raise ValueError(f"Manifest entry for {self.TYPE_NAME} at '{source_path}' has no structure metadata.")
+
+        tensors = load_file(str(filepath))
+        return self._unflatten(meta["tree"], tensors)
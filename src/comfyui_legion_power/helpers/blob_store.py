@@ -0,0 +1,208 @@
+# src/comfyui_legion_power/helpers/blob_store.py
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from ..legion_config_manager import config_manager
+from ..core.content_hash import hash_data, hash_json, UnhashableData
+from ..core.serializer_manager import serialize_to_manifest_entry
+
+BLOB_DIR_NAME = "blobs"
+BLOB_PAYLOAD_NAME = "payload"
+BLOB_ENTRY_NAME = "entry.json"
+
+BLOB_LOCK = threading.Lock()
+BLOBS = None # blob key -> {"size", "refs", "last_used"}, loaded from disk on first use
+BLOB_KEY_LOCKS = [threading.Lock() for _ in range(64)] # striped by blob key, held while a blob is written or deleted
+RUN_BLOBS = {} # run path -> blob keys its inputs were linked from
+
+
+class LegionBlobStore:
+    """
+    Serialized inputs shared by all campaigns, one per distinct payload.
+
+    An input is keyed by its serializer type and format, the data exchange options that
+    serializer reads (its OPTIONS) and a hash of its content. The first campaign to send it serializes it once into temp/blobs/<key>; every
+    campaign (that one included) gets the files hardlinked into its own inputs directory,
+    so the worker and the manifest see the usual layout.
+
+    Blobs are reference-counted per run directory and released by LegionFileManager.cleanup().
+    Unreferenced blobs stay around for the next campaign, within 'serialization.blob_cache_mb';
+    beyond it the least recently used ones are deleted. Deleting a blob never breaks a run:
+    hardlinked files live on until the run directory is removed too.
+    """
+
+    @staticmethod
+    def is_enabled():
+        return bool(config_manager.get("serialization.dedup_inputs", True))
+
+    @staticmethod
+    def _root():
+        return Path(config_manager.get("paths.temp_root_dir")) / BLOB_DIR_NAME
+
+    @staticmethod
+    def _dir_size(path: Path):
+        size = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    size += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return size
+
+    @classmethod
+    def _load_index(cls):
+        """Builds the blob index from disk (blobs left by an earlier session start unreferenced). Call with BLOB_LOCK held."""
+        global BLOBS
+        if BLOBS is not None:
+            return
+
+        BLOBS = {}
+        root = cls._root()
+        if not root.exists():
+            return
+
+        for blob_path in root.iterdir():
+            if ".tmp-" in blob_path.name:
+                shutil.rmtree(blob_path, ignore_errors=True) # Left over by an interrupted write
+                continue
+            BLOBS[blob_path.name] = {"size": cls._dir_size(blob_path), "refs": 0, "last_used": blob_path.stat().st_mtime}
+
+    @staticmethod
+    def _link(source: Path, destination: Path):
+        """Hardlinks a file or a directory tree, copying where links are not possible (e.g. another filesystem)."""
+        if source.is_dir():
+            destination.mkdir(parents=True, exist_ok=True)
+            for item in source.iterdir():
+                LegionBlobStore._link(item, destination / item.name)
+            return
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+
+    @classmethod
+    def _write_blob(cls, key, serializer, data, payload_name, relative_path):
+        """Serializes 'data' into a new blob. Returns its manifest entry (without 'path')."""
+        root = cls._root()
+        staging_path = root / f"{key}.tmp-{uuid.uuid4().hex[:8]}"
+        staging_path.mkdir(parents=True)
+        try:
+            entry = serialize_to_manifest_entry(serializer, data, staging_path / payload_name, relative_path)
+            entry.pop("path", None)
+            with open(staging_path / BLOB_ENTRY_NAME, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(staging_path, root / key)
+        except Exception:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+        return entry
+
+    @classmethod
+    def serialize_input(cls, serializer, data, destination_path: Path, relative_path: str, run_path: Path, options: dict,
+                        content_hash=None):
+        """
+        Returns the manifest entry of 'data' serialized at 'destination_path', taken from the
+        blob store when the same payload was already serialized. Returns None if 'data' cannot
+        be deduplicated (the caller serializes it as usual).
+        'content_hash' is the digest of 'data' when the caller already has it (see InputHashes).
+        """
+        if getattr(serializer, 'IS_PRIMITIVE', False) or serializer.FORMAT == "shm":
+            return None # Primitives live in the manifest, shm segments are owned by one run
+
+        try:
+            if content_hash is None:
+                content_hash = hash_data(data)
+        except UnhashableData:
+            return None
+        # Options that do not change the payload (e.g. chunk_size, content_addressed) stay out of the key
+        options = options or {}
+        key = hash_json({
+            "type": serializer.TYPE_NAME,
+            "format": serializer.FORMAT,
+            "options": {name: options.get(name) for name in serializer.OPTIONS},
+            "data": content_hash,
+        })
+
+        with BLOB_LOCK:
+            cls._load_index()
+        key_lock = cls._key_lock(key)
+
+        # Keep the destination's extension: single-file serializers pick their encoding from it
+        payload_name = BLOB_PAYLOAD_NAME + Path(destination_path).suffix
+        blob_path = cls._root() / key
+        with key_lock:
+            if blob_path.exists():
+                with open(blob_path / BLOB_ENTRY_NAME, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                print(f"[LegionPower]  - Linked from blob {key[:12]} (already serialized)")
+                written = False
+            else:
+                entry = cls._write_blob(key, serializer, data, payload_name, relative_path)
+                written = True
+
+            cls._link(blob_path / payload_name, Path(destination_path))
+
+            with BLOB_LOCK:
+                blob = BLOBS.get(key)
+                if blob is None or written:
+                    blob = BLOBS[key] = {"size": cls._dir_size(blob_path), "refs": 0, "last_used": 0.0}
+                blob["refs"] += 1
+                blob["last_used"] = time.time()
+                RUN_BLOBS.setdefault(Path(run_path), []).append(key)
+
+        entry = dict(entry)
+        entry["path"] = relative_path
+        return entry
+
+    @staticmethod
+    def _key_lock(key):
+        # A fixed set of locks: nothing to clean up when a blob goes away
+        return BLOB_KEY_LOCKS[int(key[:8], 16) % len(BLOB_KEY_LOCKS)]
+
+    @classmethod
+    def release_run(cls, run_path: Path):
+        """Drops the references held by a run directory's inputs and trims the unreferenced blobs."""
+        with BLOB_LOCK:
+            keys = RUN_BLOBS.pop(Path(run_path), [])
+            if not keys:
+                return
+            now = time.time()
+            for key in keys:
+                blob = BLOBS.get(key)
+                if blob is not None:
+                    blob["refs"] = max(0, blob["refs"] - 1)
+                    blob["last_used"] = now
+            cls._evict_unreferenced()
+
+    @classmethod
+    def _evict_unreferenced(cls):
+        """Deletes the least recently used unreferenced blobs beyond 'serialization.blob_cache_mb'. Call with BLOB_LOCK held."""
+        max_size = float(config_manager.get("serialization.blob_cache_mb", 1024)) * 1024 * 1024
+        unreferenced = sorted(
+            ((key, blob) for key, blob in BLOBS.items() if blob["refs"] == 0),
+            key=lambda item: item[1]["last_used"],
+        )
+        total = sum(blob["size"] for _, blob in unreferenced)
+
+        for key, blob in unreferenced:
+            if total <= max_size:
+                break
+            key_lock = cls._key_lock(key)
+            if not key_lock.acquire(blocking=False):
+                continue # Being linked right now (or another blob of its stripe is)
+            try:
+                shutil.rmtree(cls._root() / key, ignore_errors=True)
+                del BLOBS[key]
+                total -= blob["size"]
+            finally:
+                key_lock.release()
+            print(f"[LegionPower] Removed unreferenced blob {key[:12]} ({blob['size'] / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,333 @@
+# src/comfyui_legion_power/helpers/campaign_engine.py
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+import concurrent.futures
+from typing import Dict, Any
+
+import aiohttp
+
+from ..legion_config_manager import config_manager
+from .api_client import EXECUTION_TIMEOUT, POLL_INITIAL_INTERVAL, POLL_MAX_INTERVAL
+from .worker_manager import LegionWorkerManager
+from .campaign_progress import CampaignProgress, ProgressRelay
+
+CANCEL_TIMEOUT = 30 # Seconds to wait for a worker to drop a cancelled campaign's prompt
+
+
+class LegionCampaignEngine:
+    """
+    A single background asyncio event loop that drives every in-flight campaign:
+    submission to /prompt, waiting for completion (WebSocket events, /history polling
+    as fallback) and fetching the history entry.
+
+    Concurrency is bounded globally ('campaigns.max_concurrent') and per worker
+    ('campaigns.max_per_worker'); campaigns over the limits wait in the Master
+    instead of piling up threads.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.max_concurrent = max(1, int(config_manager.get('campaigns.max_concurrent', 32)))
+        self.max_per_worker = max(1, int(config_manager.get('campaigns.max_per_worker', 4)))
+        self.http_pool_size = max(1, int(config_manager.get('worker.http_pool_size', 8)))
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="Legion-CampaignEngine")
+        self._thread.start()
+
+        # Created lazily inside the loop
+        self._session = None
+        self._global_slots = None
+        self._worker_slots = {}
+        self._tasks = {} # campaign id -> task running it
+        self._connection_stats = {} # "host:port" -> {"opens", "requests", "reuses"} of the engine's session
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "LegionCampaignEngine":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = LegionCampaignEngine()
+                    print(f"[LegionPower Engine] Campaign engine started "
+                          f"(max {cls._instance.max_concurrent} campaigns, {cls._instance.max_per_worker} per worker)")
+        return cls._instance
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    # --- Public API (thread-safe) ---
+
+    def submit_campaign(self, campaign, workflow_json: Dict[str, Any], client_id: str = "legion_master",
+                        status: str = "EXECUTING") -> concurrent.futures.Future:
+        """
+        Schedules a campaign on its resolved worker and returns a future with the execution result.
+
+        The campaign's status is set to 'status' now and updated (COMPLETED / FAILED) before the
+        future resolves, so waiting on campaign.future is enough to read a final status.
+        """
+        campaign.status = status
+        campaign.progress = CampaignProgress(campaign, total_nodes=len(workflow_json))
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_campaign(campaign, workflow_json, client_id), self._loop
+        )
+        campaign.future = future
+        return future
+
+    def cancel_campaigns(self, campaigns):
+        """
+        Cancels the unfinished campaigns and blocks until their workers have let go of them:
+        a prompt still queued is deleted from the worker's queue, a running one is interrupted.
+        Their workers are released and their run directories can be cleaned up afterwards.
+        """
+        futures = [
+            asyncio.run_coroutine_threadsafe(self._cancel_campaign(campaign), self._loop)
+            for campaign in campaigns
+            if getattr(campaign, 'future', None) is not None and not campaign.future.done()
+        ]
+        if futures:
+            concurrent.futures.wait(futures, timeout=CANCEL_TIMEOUT + 5)
+
+    @classmethod
+    def get_connection_stats(cls) -> dict:
+        """
+        Per-worker statistics of the engine's HTTP session, which carries every campaign's traffic:
+        connections opened, requests sent and requests that reused an open connection.
+        Empty until the engine has started.
+        """
+        engine = cls._instance
+        if engine is None:
+            return {}
+        with engine._stats_lock:
+            return {host: dict(stats) for host, stats in engine._connection_stats.items()}
+
+    def submit_workflow(self, port: int, workflow_json: Dict[str, Any], client_id: str = "legion_master") -> concurrent.futures.Future:
+        """Schedules a bare workflow (no campaign bookkeeping) on a worker."""
+        return asyncio.run_coroutine_threadsafe(self._execute(port, workflow_json, client_id), self._loop)
+
+    # --- Coroutines (run on the engine loop) ---
+
+    async def _run_campaign(self, campaign, workflow_json, client_id):
+        self._tasks[campaign.campaign_id] = asyncio.current_task()
+        try:
+            result = await self._execute(campaign.resolved_port, workflow_json, client_id, campaign.progress)
+        except BaseException as e:
+            campaign.status = "FAILED"
+            campaign.error = "cancelled" if isinstance(e, asyncio.CancelledError) else str(e)
+            print(f"[LegionPower Engine] Campaign {campaign.campaign_id} FAILED: {campaign.error}")
+            raise
+        finally:
+            # The worker is free for the next campaign as soon as its execution is over
+            # (for a cancelled one: once its prompt is off the worker, see _withdraw_prompt)
+            self._tasks.pop(campaign.campaign_id, None)
+            LegionWorkerManager.release_worker(campaign)
+
+        campaign.status = "COMPLETED"
+        print(f"[LegionPower Engine] Campaign {campaign.campaign_id} COMPLETED on port {campaign.resolved_port}")
+        return result
+
+    async def _cancel_campaign(self, campaign):
+        # Submissions reach the loop in order, so the campaign's task has run its first step by now
+        task = self._tasks.get(campaign.campaign_id)
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.wait([task])
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.http_pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._stats_trace()])
+        return self._session
+
+    def _stats_trace(self) -> aiohttp.TraceConfig:
+        """Counts requests and connection opens/reuses per worker (see get_connection_stats)."""
+        def count(ctx, field):
+            with self._stats_lock:
+                stats = self._connection_stats.setdefault(ctx.host, {"opens": 0, "requests": 0, "reuses": 0})
+                stats[field] += 1
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = f"{params.url.host}:{params.url.port}"
+            count(ctx, "requests")
+
+        async def on_connection_create_end(session, ctx, params):
+            count(ctx, "opens")
+
+        async def on_connection_reuseconn(session, ctx, params):
+            count(ctx, "reuses")
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def _slots_for(self, port) -> asyncio.Semaphore:
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrent)
+        if port not in self._worker_slots:
+            self._worker_slots[port] = asyncio.Semaphore(self.max_per_worker)
+        return self._worker_slots[port]
+
+    async def _execute(self, port, workflow_json, client_id, progress=None):
+        worker_slots = self._slots_for(port)
+
+        # Per-worker slot first: a campaign queued behind a busy worker must not hold a global slot
+        async with worker_slots, self._global_slots:
+            session = await self._get_session()
+            deadline = time.monotonic() + EXECUTION_TIMEOUT
+
+            # ComfyUI routes 'executing' events to the submitting client: one id per submission
+            client_id = f"{client_id}_{uuid.uuid4().hex[:8]}"
+            # Chosen here rather than by the worker, so a campaign cancelled mid-submission can still be withdrawn
+            prompt_id = str(uuid.uuid4())
+
+            ws = None
+            try:
+                ws = await session.ws_connect(f"ws://127.0.0.1:{port}/ws?clientId={client_id}", timeout=5)
+            except Exception as e:
+                print(f"[LegionPower Engine] WARNING: Could not open event socket on port {port} ({e}), falling back to /history polling.")
+
+            try:
+                prompt_id = await self._submit_prompt(session, port, workflow_json, client_id, prompt_id)
+                print(f"[LegionPower Engine] Workflow submitted to port {port} with prompt_id: {prompt_id}")
+
+                if ws is not None:
+                    await self._wait_via_socket(ws, prompt_id, deadline, progress)
+
+                # After a socket notification the history is already there: this is a single request
+                execution_info = await self._wait_via_polling(session, port, prompt_id, deadline)
+            except asyncio.CancelledError:
+                # Cancelling here does not stop the worker: take the prompt off it before its
+                # worker is released and its run directory deleted
+                await self._withdraw_prompt(session, port, prompt_id)
+                raise
+            finally:
+                if ws is not None:
+                    await ws.close()
+
+            if 'outputs' not in execution_info:
+                raise RuntimeError(f"Workflow execution failed or produced no outputs")
+
+            return {
+                "prompt_id": prompt_id,
+                "history": execution_info,
+                "status": "completed"
+            }
+
+    async def _submit_prompt(self, session, port, workflow_json, client_id, prompt_id) -> str:
+        payload = {
+            "prompt": workflow_json,
+            "client_id": client_id,
+            "prompt_id": prompt_id,
+        }
+        async with session.post(f"http://127.0.0.1:{port}/prompt", json=payload, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            result = await response.json()
+
+        prompt_id = result.get('prompt_id')
+        if not prompt_id:
+            raise ValueError("No prompt_id returned from ComfyUI API")
+        return prompt_id
+
+    async def _withdraw_prompt(self, session, port, prompt_id):
+        """
+        Deletes a cancelled campaign's prompt from the worker's queue, or interrupts it if it is
+        already running, and returns once the worker no longer has it (or after CANCEL_TIMEOUT).
+        """
+        base_url = f"http://127.0.0.1:{port}"
+        timeout = aiohttp.ClientTimeout(total=5)
+        deadline = time.monotonic() + CANCEL_TIMEOUT
+        interrupted = False
+        try:
+            async with session.post(f"{base_url}/queue", json={"delete": [prompt_id]}, timeout=timeout):
+                pass
+
+            while time.monotonic() < deadline:
+                async with session.get(f"{base_url}/queue", timeout=timeout) as response:
+                    queue = await response.json()
+                running = [item[1] for item in queue.get("queue_running", [])]
+                pending = [item[1] for item in queue.get("queue_pending", [])]
+                if prompt_id not in running and prompt_id not in pending:
+                    print(f"[LegionPower Engine] Prompt {prompt_id} withdrawn from port {port}")
+                    return
+
+                if prompt_id in running and not interrupted:
+                    async with session.post(f"{base_url}/interrupt", json={"prompt_id": prompt_id}, timeout=timeout):
+                        pass
+                    interrupted = True
+                await asyncio.sleep(POLL_INITIAL_INTERVAL)
+
+            print(f"[LegionPower Engine] WARNING: Prompt {prompt_id} still on port {port} after {CANCEL_TIMEOUT}s")
+        except Exception as e:
+            print(f"[LegionPower Engine] WARNING: Could not withdraw prompt {prompt_id} from port {port}: {e}")
+
+    async def _wait_via_socket(self, ws, prompt_id, deadline, progress=None) -> bool:
+        """
+        Returns True when the worker reports completion, False if the socket closed early.
+        The prompt's events are also recorded in 'progress' (a CampaignProgress), if given.
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Workflow execution timed out after {EXECUTION_TIMEOUT}s")
+
+            try:
+                message = await ws.receive(timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+
+            if message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                print(f"[LegionPower Engine] WARNING: Event socket closed, falling back to /history polling.")
+                return False
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue # Binary frames are previews, not status events
+
+            event = json.loads(message.data)
+            data = event.get("data", {})
+            if data.get("prompt_id") != prompt_id:
+                continue
+
+            event_type = event.get("type")
+            if progress is not None:
+                progress.on_event(event_type, data)
+
+            if event_type == "execution_error":
+                raise RuntimeError(
+                    f"Workflow execution failed on node {data.get('node_id')} ({data.get('node_type')}): "
+                    f"{data.get('exception_message', 'unknown error')}"
+                )
+            if event_type == "executing" and data.get("node") is None:
+                return True
+
+    async def _wait_via_polling(self, session, port, prompt_id, deadline) -> Dict[str, Any]:
+        interval = POLL_INITIAL_INTERVAL
+
+        while time.monotonic() < deadline:
+            async with session.get(f"http://127.0.0.1:{port}/history/{prompt_id}", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                history_data = await response.json()
+
+            if prompt_id in history_data:
+                return history_data[prompt_id]
+
+            await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(interval * 2, POLL_MAX_INTERVAL)
+
+        raise TimeoutError(f"Workflow execution timed out after {EXECUTION_TIMEOUT}s")
+
+
+def wait_for_campaigns(campaigns):
+    """
+    Blocks until every campaign with a pending future has finished, showing their progress
+    on the calling node's progress bar. Call it from the node's thread.
+    Failures are not raised here: they are reflected in campaign.status.
+    """
+    if any(getattr(c, 'future', None) is not None for c in campaigns):
+        ProgressRelay().wait(campaigns)
@@ -0,0 +1,125 @@
+# src/comfyui_legion_power/helpers/campaign_pipeline.py
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+PIPELINE_STATS = collections.deque(maxlen=20) # Summaries of the latest pipelined runs, newest last
+STAGES = ("serialize", "execute", "finish")
+
+
+def _merge(intervals):
+    """Sorted, non-overlapping union of (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _overlap(interval, merged):
+    start, end = interval
+    return sum(max(0.0, min(end, m_end) - max(start, m_start)) for m_start, m_end in merged)
+
+
+class CampaignPipeline:
+    """
+    Overlaps the stages of consecutive campaigns: while workers execute, the next campaigns'
+    inputs are serialized (up to 'prefetch' ahead) and finished campaigns are deserialized
+    and cleaned up, each on its own background thread.
+
+    The node driving the campaigns keeps the dispatching (worker choice, submission, retries);
+    it hands the other stages to prepare() and finish(). Each stage's busy intervals are
+    recorded to measure how much of the serialize/finish work was hidden behind execution.
+    """
+
+    def __init__(self, name: str, prefetch: int):
+        self.name = name
+        self.prefetch = max(0, int(prefetch))
+        self._prepare_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Legion-Prepare")
+        self._finish_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Legion-Finish")
+        self._intervals = {stage: [] for stage in STAGES}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    @staticmethod
+    def prefetch_for(config):
+        """'execution.pipeline.prefetch' of a legion config: campaigns prepared ahead of the workers (0 = none)."""
+        return int(config.get("execution.pipeline.prefetch", 2) or 0)
+
+    def _record(self, stage, start, end):
+        with self._lock:
+            self._intervals[stage].append((start, end))
+
+    def _timed(self, stage, fn, *args):
+        start = time.time()
+        try:
+            return fn(*args)
+        finally:
+            self._record(stage, start, time.time())
+
+    def prepare(self, fn, *args) -> concurrent.futures.Future:
+        """Runs the serialize stage fn(*args) on the prepare thread."""
+        return self._prepare_pool.submit(self._timed, "serialize", fn, *args)
+
+    def finish(self, fn, *args) -> concurrent.futures.Future:
+        """Runs the finish stage (deserialize outputs, cleanup) fn(*args) on the finish thread."""
+        return self._finish_pool.submit(self._timed, "finish", fn, *args)
+
+    def track(self, campaign):
+        """Records the execute stage of a submitted campaign, from when its worker starts it to completion."""
+        dispatched = time.time()
+
+        def on_done(_):
+            progress = getattr(campaign, 'progress', None)
+            started = progress.started_at if progress is not None and progress.started_at else dispatched
+            self._record("execute", started, time.time())
+
+        campaign.future.add_done_callback(on_done)
+
+    def shutdown(self):
+        """Drops the preparations not started yet and waits for the running stages (finish stages all run: they clean up)."""
+        self._prepare_pool.shutdown(wait=True, cancel_futures=True)
+        self._finish_pool.shutdown(wait=True)
+
+    def summary(self) -> dict:
+        """Per-stage busy time, and the share of serialize/finish time spent while a worker was executing."""
+        wall = time.time() - self._started
+        with self._lock:
+            intervals = {stage: list(values) for stage, values in self._intervals.items()}
+
+        executing = _merge(intervals["execute"])
+        summary = {"pipeline": self.name, "prefetch": self.prefetch, "wall_s": round(wall, 3)}
+        for stage in STAGES:
+            busy = sum(end - start for start, end in intervals[stage])
+            summary[f"{stage}_s"] = round(busy, 3)
+            if stage != "execute":
+                hidden = sum(_overlap(interval, executing) for interval in intervals[stage])
+                summary[f"{stage}_overlap"] = round(hidden / busy, 3) if busy > 0 else None
+
+        # What the same work takes with the stages run one after the other
+        sequential = sum(summary[f"{stage}_s"] for stage in STAGES)
+        summary["sequential_s"] = round(sequential, 3)
+        summary["saved_s"] = round(max(0.0, sequential - wall), 3)
+        return summary
+
+    def report(self, log_prefix: str):
+        summary = self.summary()
+        PIPELINE_STATS.append(summary)
+        print(
+            f"{log_prefix} Pipeline: {summary['wall_s']}s wall for {summary['sequential_s']}s of stages "
+            f"(serialize {summary['serialize_s']}s, {self._percent(summary['serialize_overlap'])} hidden; "
+            f"execute {summary['execute_s']}s; finish {summary['finish_s']}s, {self._percent(summary['finish_overlap'])} hidden)"
+        )
+        return summary
+
+    @staticmethod
+    def _percent(value):
+        return "n/a" if value is None else f"{value * 100:.0f}%"
+
+
+def get_pipeline_stats():
+    return list(PIPELINE_STATS)
@@ -0,0 +1,151 @@
+# src/comfyui_legion_power/helpers/campaign_progress.py
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+PROGRESS_LOCK = threading.Lock()
+CAMPAIGN_PROGRESS = collections.OrderedDict() # campaign id -> CampaignProgress, oldest first
+MAX_FINISHED_KEPT = 200 # Finished campaigns still listed by the status API
+PROGRESS_BAR_STEPS = 1000
+PROGRESS_REFRESH_INTERVAL = 0.25 # Seconds between two progress bar updates while waiting
+
+
+class CampaignProgress:
+    """
+    Execution progress of one campaign on its worker, fed by the worker's WebSocket events
+    (execution_start / execution_cached / executing / progress) on the engine thread and
+    read from any thread: Master progress bars, the status API.
+    """
+
+    def __init__(self, campaign, total_nodes: int):
+        self.campaign = campaign
+        self.total_nodes = max(1, total_nodes)
+        self.cached_nodes = 0
+        self.executed_nodes = set()
+        self.current_node = None
+        self.node_value = 0
+        self.node_max = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.updated_at = self.submitted_at
+
+        with PROGRESS_LOCK:
+            CAMPAIGN_PROGRESS[campaign.campaign_id] = self
+            self._forget_old_campaigns()
+
+    @staticmethod
+    def _forget_old_campaigns():
+        finished = [cid for cid, progress in CAMPAIGN_PROGRESS.items() if progress.finished]
+        for campaign_id in finished[:max(0, len(finished) - MAX_FINISHED_KEPT)]:
+            del CAMPAIGN_PROGRESS[campaign_id]
+
+    @property
+    def finished(self):
+        future = self.campaign.future
+        return future is not None and future.done()
+
+    def on_event(self, event_type: str, data: dict):
+        """Records a worker event of this campaign's prompt. Called on the engine thread."""
+        self.updated_at = time.time()
+
+        if event_type == "execution_start":
+            self.started_at = self.updated_at
+        elif event_type == "execution_cached":
+            self.cached_nodes = len(data.get("nodes") or [])
+        elif event_type == "executing":
+            if self.current_node is not None:
+                self.executed_nodes.add(self.current_node)
+            self.current_node = data.get("node")
+            self.node_value, self.node_max = 0, 0
+        elif event_type == "progress":
+            self.node_value = data.get("value", 0) or 0
+            self.node_max = data.get("max", 0) or 0
+
+    def fraction(self) -> float:
+        """Share of the prompt's nodes done (cached ones included), the running node counted by its own progress."""
+        if self.campaign.status in ("COMPLETED", "FAILED"):
+            return 1.0
+
+        done = self.cached_nodes + len(self.executed_nodes)
+        if self.current_node is not None and self.node_max:
+            done += min(1.0, self.node_value / self.node_max)
+        return min(1.0, done / self.total_nodes)
+
+    def snapshot(self) -> dict:
+        """JSON-safe view for the status API."""
+        campaign = self.campaign
+        done = self.cached_nodes + len(self.executed_nodes)
+        return {
+            "campaign_id": campaign.campaign_id,
+            "status": campaign.status,
+            "port": campaign.resolved_port,
+            "progress": round(self.fraction(), 4),
+            "nodes_total": self.total_nodes,
+            "nodes_cached": self.cached_nodes,
+            "nodes_executed": len(self.executed_nodes),
+            "nodes_remaining": max(0, self.total_nodes - done) if not self.finished else 0,
+            "current_node": self.current_node,
+            "current_node_progress": [self.node_value, self.node_max] if self.node_max else None,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "error": campaign.error,
+        }
+
+
+def get_campaign_progress(campaign_id=None):
+    """Snapshots of every tracked campaign (or of one campaign, None if unknown)."""
+    with PROGRESS_LOCK:
+        if campaign_id is not None:
+            progress = CAMPAIGN_PROGRESS.get(campaign_id)
+            return progress.snapshot() if progress else None
+        return [progress.snapshot() for progress in CAMPAIGN_PROGRESS.values()]
+
+
+class ProgressRelay:
+    """
+    Mirrors campaign progress onto the ComfyUI progress bar of the node being executed.
+    Create it in the node's own thread: ComfyUI ties progress bars to the executing node.
+    Outside ComfyUI (or with an older one) it does nothing.
+    """
+
+    def __init__(self):
+        try:
+            import comfy.utils
+            self._bar = comfy.utils.ProgressBar(PROGRESS_BAR_STEPS)
+        except Exception:
+            self._bar = None
+        self._last = -1
+
+    def update(self, fraction: float):
+        if self._bar is None:
+            return
+        value = int(max(0.0, min(1.0, fraction)) * PROGRESS_BAR_STEPS)
+        if value != self._last:
+            self._last = value
+            self._bar.update_absolute(value, PROGRESS_BAR_STEPS)
+
+    @staticmethod
+    def campaigns_fraction(campaigns) -> float:
+        """Average progress of 'campaigns' (a campaign never submitted counts as not started)."""
+        if not campaigns:
+            return 1.0
+        total = 0.0
+        for campaign in campaigns:
+            progress = getattr(campaign, 'progress', None)
+            if progress is not None:
+                total += progress.fraction()
+            elif campaign.status in ("COMPLETED", "DRY_RUN_COMPLETE"):
+                total += 1.0
+        return total / len(campaigns)
+
+    def wait(self, campaigns):
+        """Blocks until every campaign's future is done, updating the progress bar meanwhile."""
+        futures = [c.future for c in campaigns if getattr(c, 'future', None) is not None]
+        while futures:
+            self.update(self.campaigns_fraction(campaigns))
+            _, pending = concurrent.futures.wait(futures, timeout=PROGRESS_REFRESH_INTERVAL)
+            futures = list(pending)
+        self.update(self.campaigns_fraction(campaigns))
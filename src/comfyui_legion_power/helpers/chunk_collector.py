@@ -0,0 +1,89 @@
+# src/comfyui_legion_power/helpers/chunk_collector.py
+
+import threading
+from pathlib import Path
+
+import torch
+
+from ..core.serializer_manager import read_manifest_lines, PARTIAL_MANIFEST_NAME
+from ..core.serializers.chunked_serializer import ChunkedSerializer
+
+POLL_INTERVAL = 0.05 # Seconds between two reads of the partial manifest
+
+
+class ChunkCollector:
+    """
+    Decodes a run's chunked outputs while the worker's Exporter is still writing them.
+
+    A background thread follows the partial manifest of 'outputs_path' and decodes every chunk
+    as soon as its line appears, so decoding overlaps with the Exporter's encoding of the next
+    chunks. Once the campaign is over, stop() decodes what is left and take_all() hands back
+    the assembled tensors of the final manifest's chunked entries.
+    """
+
+    def __init__(self, outputs_path: Path, log_prefix: str = "[LegionPower]"):
+        self.outputs_path = Path(outputs_path)
+        self.log_prefix = log_prefix
+        self._chunks = {} # (output name, chunk index) -> decoded tensor
+        self._offset = 0
+        self._inode = None
+        self._error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="Legion-ChunkCollector")
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                self._drain()
+            except Exception as e:
+                # Not fatal: take_all() falls back to decoding from the final manifest
+                self._error = e
+                print(f"{self.log_prefix} WARNING: Chunk collector stopped: {e}")
+                return
+            if stopping:
+                return
+            self._stop.wait(POLL_INTERVAL)
+
+    def _drain(self):
+        partial_manifest_path = self.outputs_path / PARTIAL_MANIFEST_NAME
+        try:
+            stat = partial_manifest_path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # First sight, or recreated by a new export into the same directory
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._chunks.clear()
+
+        records, self._offset = read_manifest_lines(partial_manifest_path, self._offset)
+        for record in records:
+            source_path = self.outputs_path / record["dir"] / record["path"]
+            self._chunks[(record["name"], record["index"])] = ChunkedSerializer.deserialize_chunk(source_path, record)
+            print(f"{self.log_prefix}  - Decoded chunk {record['index']} of '{record['name']}' ({record['frames']} frames)")
+
+    def stop(self):
+        """Decodes the chunks not collected yet and ends the background thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def take_all(self, manifest: dict) -> dict:
+        """
+        Returns {name: tensor} for the chunked entries of 'manifest' whose chunks were all collected.
+        Call after stop(); other entries are left to the regular deserialization.
+        """
+        collected = {}
+        if self._error is not None:
+            return collected
+
+        for name, info in manifest.items():
+            if info.get("type") != ChunkedSerializer.TYPE_NAME:
+                continue
+            chunk_count = len(info.get("meta", {}).get("chunks", []))
+            keys = [(name, index) for index in range(chunk_count)]
+            if chunk_count and all(key in self._chunks for key in keys):
+                collected[name] = torch.cat([self._chunks.pop(key) for key in keys], dim=0)
+                print(f"{self.log_prefix}  - Assembled '{name}' from {chunk_count} streamed chunk(s)")
+        return collected
@@ -0,0 +1,74 @@
+# src/comfyui_legion_power/helpers/connection_pool.py
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class WorkerConnectionPool:
+    """
+    Keep-alive HTTP sessions, one per worker (host, port).
+
+    Every call to a worker goes through here, so TCP connections are reused across
+    campaigns and threads instead of being opened for each request. Each session holds
+    at most 'pool_size' connections; extra concurrent callers wait for a free one.
+    """
+
+    def __init__(self, pool_size: int = 8):
+        self.pool_size = max(1, int(pool_size))
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, port, host: str = "127.0.0.1") -> requests.Session:
+        key = (host, int(port))
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True, max_retries=0)
+                session.mount("http://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def get(self, port, path: str, host: str = "127.0.0.1", **kwargs) -> requests.Response:
+        return self.session(port, host).get(f"http://{host}:{port}{path}", **kwargs)
+
+    def post(self, port, path: str, host: str = "127.0.0.1", **kwargs) -> requests.Response:
+        return self.session(port, host).post(f"http://{host}:{port}{path}", **kwargs)
+
+    def close(self, port, host: str = "127.0.0.1"):
+        """Drops the session of a worker that went away (its connections are dead anyway)."""
+        with self._lock:
+            session = self._sessions.pop((host, int(port)), None)
+        if session is not None:
+            session.close()
+
+    def stats(self) -> dict:
+        """
+        Per-worker connection statistics: how many connections were opened and how many
+        requests reused an already-open connection.
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+
+        result = {}
+        for (host, port), session in sessions.items():
+            opens = requests_sent = 0
+            adapter = session.get_adapter(f"http://{host}:{port}")
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                opens += pool.num_connections
+                requests_sent += pool.num_requests
+
+            result[f"{host}:{port}"] = {
+                "opens": opens,
+                "requests": requests_sent,
+                "reuses": max(0, requests_sent - opens),
+            }
+        return result
@@ -1,21 +1,113 @@
 # src/comfyui_legion_power/helpers/file_manager.py
+import os
+import threading
+import time
 import uuid
 from pathlib import Path
 import shutil
 from ..legion_config_manager import config_manager
+from ..core.serializer_manager import read_manifest, INPUT_MANIFEST_NAME, OUTPUT_MANIFEST_NAME
+from ..core.serializers.shared_memory_serializer import SharedMemorySerializer
+from .blob_store import LegionBlobStore
+
+# Content-addressed run directories live in temp_root/CONTENT_DIR_NAME/<content key>-<generation>
+CONTENT_DIR_NAME = "content"
+CONTENT_LOCK = threading.Lock()
+CONTENT_DIRS_IN_USE = {} # content run path -> id of the campaign using it (at most one, see for_content)
+CONTENT_DIR_LOCKS = {} # content run path -> lock held while its inputs are written
+CONTENT_GC_INTERVAL = 60 # Minimum seconds between two scans for stale content directories
+_last_content_gc = 0.0
 
 
 class LegionFileManager:
-    def __init__(self, run_id=None):
+    def __init__(self, run_id=None, run_path=None):
         self.temp_root = Path(config_manager.get("paths.temp_root_dir"))
         self.run_id = run_id if run_id else str(uuid.uuid4())
-        self.run_path = self.temp_root / self.run_id
+        self.run_path = Path(run_path) if run_path else self.temp_root / self.run_id
+        self.content_addressed = self.run_path.parent == self.temp_root / CONTENT_DIR_NAME
+        self.campaign_id = None # Campaign the run directory is marked in use for (content-addressed only)
 
         # Non creiamo più le cartelle qui
         if not run_id:
             print(f"[LegionPower] FileManager initialized for NEW run ID: {self.run_id}")
             print(f"[LegionPower]  - Temp path: {self.run_path}")
 
+    @classmethod
+    def for_content(cls, content_key: str, campaign_id: str):
+        """
+        Returns a manager on the content-addressed run directory of 'content_key', shared by
+        every campaign with the same key so their patched prompts are identical (and the
+        worker's execution cache hits). The directory is kept after cleanup(), inputs and
+        outputs included, until it has been unused for 'data_exchange.content_ttl' seconds.
+
+        A directory created anew gets a new generation suffix: a worker that cached a
+        deleted directory's prompt must not take the new one for the same prompt.
+
+        Returns None while another campaign uses the directory: both workers would write into
+        its outputs/ (manifests included) at once, so the caller takes a private directory instead.
+        The directory is marked in use for 'campaign_id' until cleanup(), or release_when_done().
+        """
+        content_root = Path(config_manager.get("paths.temp_root_dir")) / CONTENT_DIR_NAME
+
+        with CONTENT_LOCK:
+            cls._collect_stale_content(content_root)
+
+            run_path = next(content_root.glob(f"{content_key}-*"), None) if content_root.exists() else None
+            if run_path is None:
+                run_path = content_root / f"{content_key}-{uuid.uuid4().hex[:8]}"
+            if run_path in CONTENT_DIRS_IN_USE:
+                print(f"[LegionPower] Content directory {run_path.name} is in use by a running campaign: using a private one")
+                return None
+
+            run_path.mkdir(parents=True, exist_ok=True)
+            os.utime(run_path)
+
+            CONTENT_DIRS_IN_USE[run_path] = campaign_id
+            CONTENT_DIR_LOCKS.setdefault(run_path, threading.Lock())
+
+        manager = cls(run_id=run_path.name, run_path=run_path)
+        manager.campaign_id = campaign_id
+        return manager
+
+    @classmethod
+    def for_campaign(cls, campaign):
+        """Returns a manager on the run directory the Master used for 'campaign'."""
+        manager = cls(run_id=campaign.campaign_id, run_path=getattr(campaign, 'run_path', None))
+        manager.campaign_id = campaign.campaign_id
+        return manager
+
+    @property
+    def content_lock(self):
+        """Lock to hold while checking/writing the inputs of a content-addressed run directory."""
+        with CONTENT_LOCK:
+            return CONTENT_DIR_LOCKS.setdefault(self.run_path, threading.Lock())
+
+    @staticmethod
+    def _collect_stale_content(content_root: Path):
+        """Deletes the content directories no campaign used for 'data_exchange.content_ttl' seconds. Call with CONTENT_LOCK held."""
+        global _last_content_gc
+
+        now = time.time()
+        if now - _last_content_gc < CONTENT_GC_INTERVAL or not content_root.exists():
+            return
+        _last_content_gc = now
+
+        ttl = float(config_manager.get("data_exchange.content_ttl", 3600) or 0)
+        if ttl <= 0:
+            return
+
+        for run_path in content_root.iterdir():
+            if run_path in CONTENT_DIRS_IN_USE:
+                continue
+            try:
+                if now - run_path.stat().st_mtime < ttl:
+                    continue
+                shutil.rmtree(run_path)
+                CONTENT_DIR_LOCKS.pop(run_path, None)
+                print(f"[LegionPower] Removed stale content directory: {run_path}")
+            except Exception as e:
+                print(f"[LegionPower] ERROR: Failed to remove stale content directory {run_path}: {e}")
+
     def _ensure_dir_exists(self, path: Path):
         """Helper function to create a directory only when needed."""
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -44,7 +136,64 @@ class LegionFileManager:
         self._ensure_dir_exists(path)
         return str(path.resolve())
 
+    def _release_shared_memory(self):
+        """Unlinks the shared memory segments referenced by this run's manifests."""
+        manifest_paths = [
+            self.run_path / "inputs" / INPUT_MANIFEST_NAME,
+            self.run_path / "outputs" / OUTPUT_MANIFEST_NAME,
+        ]
+        for manifest_path in manifest_paths:
+            if not manifest_path.exists():
+                continue # e.g. a failed run whose worker wrote no outputs
+            try:
+                manifest = read_manifest(manifest_path)
+            except Exception as e:
+                print(f"[LegionPower] WARNING: Could not read manifest {manifest_path} during cleanup: {e}")
+                continue
+
+            for info in manifest.values():
+                segment = info.get("meta", {}).get("shm_segment") if isinstance(info, dict) else None
+                if not segment:
+                    continue
+                try:
+                    if SharedMemorySerializer.unlink_segment(segment):
+                        print(f"[LegionPower] Unlinked shared memory segment: {segment}")
+                except Exception as e:
+                    print(f"[LegionPower] ERROR: Failed to unlink shared memory segment {segment}: {e}")
+
+    def release_when_done(self, future):
+        """
+        Releases a content-addressed run directory as soon as the worker is done with it ('future'
+        of the campaign completed, failed or cancelled), not only at cleanup(): an async campaign
+        that is never joined would keep it in use, and out of garbage collection, forever.
+        """
+        if self.content_addressed:
+            future.add_done_callback(lambda _: self._release_content_dir())
+
+    def _release_content_dir(self):
+        """
+        Marks a content-addressed run directory as no longer used by this campaign (it is kept).
+        Does nothing if it was released already, possibly taken by another campaign since.
+        """
+        with CONTENT_LOCK:
+            if CONTENT_DIRS_IN_USE.get(self.run_path) != self.campaign_id:
+                return
+            del CONTENT_DIRS_IN_USE[self.run_path]
+            try:
+                os.utime(self.run_path) # Its TTL starts from the last use
+            except OSError:
+                pass
+        print(f"[LegionPower] Released content directory: {self.run_path}")
+
     def cleanup(self):
+        LegionBlobStore.release_run(self.run_path)
+
+        if self.content_addressed:
+            self._release_content_dir()
+            return
+
+        self._release_shared_memory()
+
         if self.run_path.exists():
             try:
                 shutil.rmtree(self.run_path)
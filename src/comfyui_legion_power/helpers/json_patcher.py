@@ -1,18 +1,108 @@
 import json
 from pathlib import Path
 
-class LegionJSONPatcher:
-    def __init__(self, workflow_path: Path):
-        if not workflow_path.exists():
+from ..legion_config_manager import find_file_in_roots
+from ..core.content_hash import hash_json
+
+
+class WorkflowTemplate:
+    """
+    A worker workflow parsed once, with its patch points precomputed.
+    Its 'workflow' dict is shared by every campaign and must never be modified:
+    use new_patcher() to get a private, patchable instance.
+    """
+    def __init__(self, path: Path, stamp, workflow: dict):
+        self.path = path
+        self.stamp = stamp # (mtime_ns, size) of the file when it was parsed
+        self.workflow = workflow
+        self.importer_node_ids = [
+            node_id for node_id, node_data in workflow.items()
+            if isinstance(node_data, dict) and node_data.get("class_type") == "LegionImporter"
+        ]
+        self._content_hash = None
+
+    @property
+    def content_hash(self) -> str:
+        """Digest of the workflow's content, computed on first use."""
+        if self._content_hash is None:
+            self._content_hash = hash_json(self.workflow)
+        return self._content_hash
+
+    def new_patcher(self) -> "LegionJSONPatcher":
+        return LegionJSONPatcher.from_template(self)
+
+
+class WorkflowRegistry:
+    """
+    Parsed worker workflows, shared by all campaigns. A file is parsed again only when
+    its mtime or size changes, and a workflow name is searched in the roots only once.
+    """
+    _templates = {} # resolved path -> WorkflowTemplate
+    _resolved = {} # (roots_key, filename) -> resolved path
+
+    @classmethod
+    def get(cls, workflow_path: Path) -> WorkflowTemplate:
+        workflow_path = Path(workflow_path)
+        try:
+            stat = workflow_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Workflow file not found at: {workflow_path}")
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        template = cls._templates.get(workflow_path)
+        if template is not None and template.stamp == stamp:
+            return template
+
         with open(workflow_path, 'r', encoding='utf-8') as f:
-            self.workflow = json.load(f)
+            template = WorkflowTemplate(workflow_path, stamp, json.load(f))
+        cls._templates[workflow_path] = template
+        return template
+
+    @classmethod
+    def find(cls, filename: str, roots_key: str = "paths.workflows_roots") -> WorkflowTemplate:
+        """Returns the template of a workflow found by name in the configured roots."""
+        path = cls._resolved.get((roots_key, filename))
+        if path is not None:
+            try:
+                return cls.get(path)
+            except FileNotFoundError:
+                del cls._resolved[(roots_key, filename)] # Moved or deleted: search the roots again
+
+        path = find_file_in_roots(filename, roots_key)
+        cls._resolved[(roots_key, filename)] = path
+        return cls.get(path)
+
+
+class LegionJSONPatcher:
+    def __init__(self, workflow_path: Path):
+        self._start_from(WorkflowRegistry.get(workflow_path))
+
+    @classmethod
+    def from_template(cls, template: WorkflowTemplate) -> "LegionJSONPatcher":
+        patcher = cls.__new__(cls)
+        patcher._start_from(template)
+        return patcher
+
+    def _start_from(self, template: WorkflowTemplate):
+        # Copy-on-write: nodes stay shared with the template until they are patched
+        self.template = template
+        self.workflow = dict(template.workflow)
+        self._owned = set() # ids of the dicts private to this instance
+
+    def _own(self, parent: dict, key):
+        """Returns parent[key], first replaced by a private copy if it is still shared."""
+        child = parent[key]
+        if id(child) not in self._owned:
+            child = dict(child)
+            parent[key] = child
+            self._owned.add(id(child))
+        return child
 
     def patch(self, remote_arg: str, value):
         """
         Patch a value in the workflow JSON using dot notation.
         Auto-creates missing intermediate dictionaries.
-        
+
         Example: patch("12.inputs.data_exchange_root", "/path/to/data")
         """
         try:
@@ -23,22 +113,23 @@ class LegionJSONPatcher:
             if node_id not in self.workflow:
                 raise KeyError(f"Node '{node_id}' not found in workflow")
 
-            target_dict = self.workflow[node_id]
-            
+            target_dict = self._own(self.workflow, node_id)
+
             # Navigate/create intermediate keys
             for key in keys[1:-1]:
                 if key not in target_dict:
                     # Auto-create missing intermediate dictionary
                     target_dict[key] = {}
+                    self._owned.add(id(target_dict[key]))
                     print(f"[LegionPower] Created missing key '{key}' in path '{remote_arg}'")
-                target_dict = target_dict[key]
+                target_dict = self._own(target_dict, key)
 
             # Set the final value
             final_key = keys[-1]
             target_dict[final_key] = value
             print(f"[LegionPower] Patched workflow: Set '{remote_arg}' to '{value}'")
-            
-        except (KeyError, IndexError, TypeError) as e:
+
+        except (KeyError, IndexError, TypeError, ValueError) as e:
             print(f"[LegionPower] WARNING: Could not patch workflow. Invalid remote_arg '{remote_arg}': {e}")
             raise
 
@@ -51,6 +142,7 @@ class LegionJSONPatcher:
             "inputs": inputs,
             "class_type": class_type
         }
+        self._owned.add(id(self.workflow[node_id]))
         print(f"[LegionPower] Patched workflow: Added node '{node_id}' of type '{class_type}'.")
 
     def get_patched_workflow(self):
@@ -4,8 +4,8 @@ import subprocess
 import sys
 from pathlib import Path
 import time
-import urllib.request
-import json
+
+from .worker_manager import WORKER_CONNECTIONS
 
 # Dictionary to keep track of running worker processes, indexed by port
 WORKER_PROCESSES = {}
@@ -26,13 +26,12 @@ class LegionProcessManager:
             # The logic will be more complex later.
             return False
 
-        url = f"http://{host}:{port}/queue"
         try:
-            with urllib.request.urlopen(url, timeout=1) as response:
-                if response.status == 200:
-                    # We can even check the content if needed
-                    # data = json.loads(response.read())
-                    return True
+            response = WORKER_CONNECTIONS.get(port, "/queue", host=host, timeout=1)
+            if response.status_code == 200:
+                # We can even check the content if needed
+                # data = response.json()
+                return True
         except Exception:
             return False
         return False
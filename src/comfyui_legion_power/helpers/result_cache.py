@@ -0,0 +1,207 @@
+# src/comfyui_legion_power/helpers/result_cache.py
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from ..legion_config_manager import config_manager
+from ..core.content_hash import hash_json, UnhashableData
+from ..core.serializer_manager import read_manifest, deserialize_manifest, OUTPUT_MANIFEST_NAME
+
+# Placeholder standing for the run directory in the cache key: every run gets its own
+# directory, so the patched prompt is compared with it normalized away
+RUN_ROOT_PLACEHOLDER = "<data_exchange_root>"
+
+
+def campaign_content_key(config, input_hashes):
+    """
+    Returns a digest of everything a worker would run for a campaign: the worker workflow,
+    the patch applied to it (with the run directory normalized), the worker identity, the
+    data exchange options and the content of every input ('input_hashes', an InputHashes).
+    Returns None if there is no workflow to patch or an input has no hashable content.
+    """
+    from ..helpers.json_patcher import WorkflowRegistry
+    from ..helpers.worker_manager import LegionWorkerManager
+
+    workflow_filename = config.get("workflow")
+    if not workflow_filename:
+        return None
+    template = WorkflowRegistry.find(workflow_filename)
+    if not template.importer_node_ids:
+        return None
+
+    try:
+        inputs = input_hashes.all()
+    except UnhashableData as e:
+        print(f"[LegionPower] Campaign content cannot be hashed: {e}")
+        return None
+
+    return hash_json({
+        "workflow": template.content_hash,
+        "patches": {f"{template.importer_node_ids[0]}.inputs.data_exchange_root": RUN_ROOT_PLACEHOLDER},
+        "worker": LegionWorkerManager._get_config_hash(config),
+        "data_exchange": config.get("data_exchange") or {},
+        "inputs": inputs,
+    })
+
+
+class LegionResultCache:
+    """
+    On-disk cache of campaign results, keyed by the content of what a worker would run
+    (see campaign_content_key). A campaign with a known key gets the stored outputs back
+    without a worker.
+
+    Each entry is a copy of a run's 'outputs' directory, named after its key. The total size
+    is capped by 'result_cache.max_size_mb'; the least recently used entries go first.
+    Outputs passed through shared memory are never cached (their segments do not outlive the run).
+    """
+    _lock = threading.Lock()
+    _entries = None # key -> [size in bytes, last used], loaded from disk on first use
+    _total_size = 0
+
+    @staticmethod
+    def is_enabled(config):
+        """'execution.result_cache' in a legion config overrides the global 'result_cache.enabled'."""
+        enabled = config.get("execution.result_cache")
+        if enabled is None:
+            enabled = config_manager.get("result_cache.enabled", False)
+        return bool(enabled)
+
+    @staticmethod
+    def _root():
+        return Path(config_manager.get("paths.result_cache_dir"))
+
+    @staticmethod
+    def _max_size():
+        return int(float(config_manager.get("result_cache.max_size_mb", 2048)) * 1024 * 1024)
+
+    @staticmethod
+    def make_key(config, input_hashes):
+        """
+        Returns the cache key of running 'config's workflow on the inputs of 'input_hashes' (an InputHashes),
+        or None if the campaign cannot be cached (cache disabled, or an input with no hashable content).
+        """
+        if not LegionResultCache.is_enabled(config):
+            return None
+        return campaign_content_key(config, input_hashes)
+
+    @staticmethod
+    def _dir_size(path: Path):
+        size = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    size += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return size
+
+    @classmethod
+    def _load_index(cls):
+        """Builds the in-memory index from the cache directory. Call with _lock held."""
+        if cls._entries is not None:
+            return
+
+        cls._entries = {}
+        cls._total_size = 0
+        root = cls._root()
+        if not root.exists():
+            return
+
+        for entry in root.iterdir():
+            if not entry.is_dir():
+                continue
+            if ".tmp-" in entry.name:
+                shutil.rmtree(entry, ignore_errors=True) # Left over by an interrupted store
+                continue
+            size = cls._dir_size(entry)
+            cls._entries[entry.name] = [size, entry.stat().st_mtime]
+            cls._total_size += size
+
+    @classmethod
+    def _evict(cls, max_size):
+        """Deletes least recently used entries until the cache fits 'max_size'. Call with _lock held."""
+        root = cls._root()
+        for key, (size, _) in sorted(cls._entries.items(), key=lambda item: item[1][1]):
+            if cls._total_size <= max_size:
+                break
+            shutil.rmtree(root / key, ignore_errors=True)
+            del cls._entries[key]
+            cls._total_size -= size
+            print(f"[LegionPower] Result cache: evicted entry {key[:12]} ({size / 1024 / 1024:.1f} MB)")
+
+    @classmethod
+    def load(cls, key):
+        """Returns the cached outputs (name -> data) for 'key', or None on a miss."""
+        if key is None:
+            return None
+
+        with cls._lock:
+            cls._load_index()
+            entry = cls._entries.get(key)
+            if entry is None:
+                return None
+            entry[1] = time.time()
+
+        entry_path = cls._root() / key
+        try:
+            os.utime(entry_path) # Keeps the LRU order across restarts
+            output_manifest = read_manifest(entry_path / OUTPUT_MANIFEST_NAME)
+            return deserialize_manifest(output_manifest, entry_path)
+        except Exception as e:
+            print(f"[LegionPower] WARNING: Result cache entry {key[:12]} is unreadable, dropping it: {e}")
+            with cls._lock:
+                if cls._entries.pop(key, None) is not None:
+                    cls._total_size -= entry[0]
+            shutil.rmtree(entry_path, ignore_errors=True)
+            return None
+
+    @classmethod
+    def store(cls, key, outputs_path: Path, move: bool = True):
+        """
+        Moves (or, with move=False, copies) a completed run's outputs directory into the cache
+        under 'key'. Returns False (leaving the directory in place) if the outputs cannot be cached.
+        """
+        if key is None:
+            return False
+
+        outputs_path = Path(outputs_path)
+        output_manifest = read_manifest(outputs_path / OUTPUT_MANIFEST_NAME)
+        if not output_manifest:
+            return False
+        if any(isinstance(info, dict) and info.get("meta", {}).get("shm_segment") for info in output_manifest.values()):
+            print("[LegionPower] Result cache: outputs in shared memory are not cached")
+            return False
+
+        size = cls._dir_size(outputs_path)
+        max_size = cls._max_size()
+        if size > max_size:
+            print(f"[LegionPower] Result cache: outputs ({size / 1024 / 1024:.1f} MB) exceed result_cache.max_size_mb, not cached")
+            return False
+
+        root = cls._root()
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Move next to the final name first, so an entry only ever appears complete
+        staging_path = root / f"{key}.tmp-{uuid.uuid4().hex[:8]}"
+        if move:
+            shutil.move(str(outputs_path), str(staging_path))
+        else:
+            shutil.copytree(outputs_path, staging_path)
+
+        with cls._lock:
+            cls._load_index()
+            if key in cls._entries:
+                shutil.rmtree(staging_path, ignore_errors=True) # Stored meanwhile by an identical campaign
+                return True
+
+            os.replace(staging_path, root / key)
+            cls._entries[key] = [size, time.time()]
+            cls._total_size += size
+            cls._evict(max_size)
+
+        print(f"[LegionPower] Result cache: stored entry {key[:12]} ({size / 1024 / 1024:.1f} MB)")
+        return True
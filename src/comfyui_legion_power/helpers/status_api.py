@@ -0,0 +1,44 @@
+# src/comfyui_legion_power/helpers/status_api.py
+
+from .campaign_engine import LegionCampaignEngine
+from .campaign_progress import get_campaign_progress
+from .campaign_pipeline import get_pipeline_stats
+from .worker_manager import LegionWorkerManager
+
+
+def get_status():
+    """Everything the status API reports: campaigns with their progress, workers, the campaign engine's HTTP connections, pipeline statistics."""
+    return {
+        "campaigns": get_campaign_progress(),
+        "workers": LegionWorkerManager.get_workers_status(),
+        "connections": LegionCampaignEngine.get_connection_stats(),
+        "pipelines": get_pipeline_stats(),
+    }
+
+
+def register_status_routes():
+    """
+    Adds the LegionPower status routes to ComfyUI's web server:
+      GET /legion/status                -> campaigns, workers, connections and pipeline statistics
+      GET /legion/status/{campaign_id}  -> one campaign's progress (404 if unknown)
+    Returns False when not running inside ComfyUI's server.
+    """
+    try:
+        from aiohttp import web
+        from server import PromptServer
+        routes = PromptServer.instance.routes
+    except (ImportError, AttributeError):
+        return False
+
+    @routes.get("/legion/status")
+    async def legion_status(request):
+        return web.json_response(get_status())
+
+    @routes.get("/legion/status/{campaign_id}")
+    async def legion_campaign_status(request):
+        progress = get_campaign_progress(request.match_info["campaign_id"])
+        if progress is None:
+            return web.json_response({"error": "unknown campaign"}, status=404)
+        return web.json_response(progress)
+
+    return True
@@ -2,15 +2,48 @@ import os
 import subprocess
 import sys
 import time
-import urllib.request
 import threading
 import shlex
-
-WORKER_PROCESSES = {}
-WORKER_PORTS = {}
-PORT_LOCK = threading.Lock()
+import socket
 
 from ..legion_config_manager import config_manager, COMFYUI_ROOT_PATH
+from .connection_pool import WorkerConnectionPool
+from .worker_output import WorkerOutputReader
+
+WORKER_PROCESSES = {}
+WORKER_OUTPUTS = {} # port -> WorkerOutputReader draining the worker's stdout/stderr
+WORKER_PORTS = {} # registry key (config hash, plus '#N' for replicas N > 0) -> port
+WORKER_INFLIGHT = {} # port -> campaigns dispatched to it and not finished yet
+REPLICA_LAUNCHES = set() # registry keys of replicas being launched in the background
+WORKER_LAST_USED = {} # port -> time.monotonic() of its last dispatch or release
+PORT_RESERVATIONS = set() # ports handed out to launches that have not finished starting yet
+KEPT_REPLICAS = {} # config hash -> replicas spared by idle shutdown and eviction (pool min_replicas, warm pool size)
+EVICTED_PROCESSES = {} # port -> process of a worker evicted to free the port, stopped by the launch that took it
+WORKER_HEALTH = {} # port -> {"alive", "queue_depth", "last_seen", "checked"}, kept fresh by the heartbeats
+HEARTBEATS = {} # port -> heartbeat thread of a registered worker
+PORT_LOCK = threading.Lock() # guards the registries above; never held while a worker starts up
+CONFIG_SYNC = {} # config hash -> ConfigSync
+WARM_POOL_STARTED = False
+WORKER_ENV_MARKER = "LEGION_WORKER" # set in the environment of the workers we launch
+REAPER_STARTED = False
+
+# Keep-alive HTTP sessions to the workers, shared by every caller (API client, liveness checks)
+WORKER_CONNECTIONS = WorkerConnectionPool(pool_size=config_manager.get('worker.http_pool_size', 8))
+
+
+class ConfigSync:
+    """
+    Per-config synchronization, so configs never wait on each other:
+    - 'launch' is held while the config's first worker starts: concurrent campaigns with the
+      same config wait for that one launch instead of starting their own
+    - 'dispatch' guards the in-flight counts and pool growth of the config's replicas,
+      and is only held for a few dictionary operations
+    Lock order: launch -> dispatch -> PORT_LOCK.
+    """
+
+    def __init__(self):
+        self.launch = threading.Lock()
+        self.dispatch = threading.Lock()
 
 
 class LegionWorkerManager:
@@ -45,128 +78,819 @@ class LegionWorkerManager:
     @staticmethod
     def is_worker_alive(port):
         if not port: return False
-        url = f"http://127.0.0.1:{port}/queue"
         try:
-            with urllib.request.urlopen(url, timeout=1.5) as response:
-                return response.status == 200
+            response = WORKER_CONNECTIONS.get(port, "/queue", timeout=1.5)
+            return response.status_code == 200
         except:
             return False
 
     @staticmethod
-    def ensure_worker_is_alive(campaign):
+    def get_workers_status():
+        """
+        Registered workers with their cached health and campaigns in flight.
+        Never probes a worker, so it is safe to call from the server's event loop.
+        """
+        now = time.monotonic()
+        workers = []
+        for key, port in list(WORKER_PORTS.items()):
+            health = WORKER_HEALTH.get(port) or {}
+            last_seen = health.get("last_seen")
+            workers.append({
+                "key": key,
+                "port": port,
+                "alive": health.get("alive"),
+                "queue_depth": health.get("queue_depth"),
+                "seconds_since_seen": round(now - last_seen, 2) if last_seen is not None else None,
+                "inflight": WORKER_INFLIGHT.get(port, 0),
+                "launched_here": port in WORKER_PROCESSES,
+            })
+        return workers
+
+    @staticmethod
+    def get_connection_stats():
+        """Returns opened/reused connection counts for every worker."""
+        return WORKER_CONNECTIONS.stats()
+
+    @staticmethod
+    def get_worker_health(port):
+        """
+        Returns the worker's health: {"alive", "queue_depth", "last_seen"} (last_seen is a
+        time.monotonic() value). Served from the heartbeat cache; probes only when it is stale.
+        """
+        process = WORKER_PROCESSES.get(port)
+        if process is not None and process.poll() is not None:
+            health = dict(WORKER_HEALTH.get(port) or {"queue_depth": None, "last_seen": None})
+            health["alive"] = False
+            return health
+
+        health = WORKER_HEALTH.get(port)
+        if health is None or time.monotonic() - health["checked"] > LegionWorkerManager._health_max_age():
+            health = LegionWorkerManager._probe_health(port)
+        return health
+
+    @staticmethod
+    def _heartbeat_interval():
+        return max(0.1, float(config_manager.get('worker.heartbeat_interval', 2.0) or 2.0))
+
+    @staticmethod
+    def _health_max_age():
+        # A couple of missed beats (e.g. a slow /queue reply) still count as fresh
+        return 3 * LegionWorkerManager._heartbeat_interval()
+
+    @staticmethod
+    def _probe_health(port):
+        """
+        One /queue request: returns the worker's health, and caches it while the worker is registered
+        (a registered worker found alive again without a heartbeat gets a new one).
+        """
+        now = time.monotonic()
+        previous = WORKER_HEALTH.get(port) or {"queue_depth": None, "last_seen": None}
+        try:
+            response = WORKER_CONNECTIONS.get(port, "/queue", timeout=1.5)
+            if response.status_code != 200:
+                raise ConnectionError(f"HTTP {response.status_code}")
+            queue = response.json()
+            health = {
+                "alive": True,
+                "queue_depth": len(queue.get("queue_running", [])) + len(queue.get("queue_pending", [])),
+                "last_seen": now,
+            }
+        except Exception:
+            health = {"alive": False, "queue_depth": previous["queue_depth"], "last_seen": previous["last_seen"]}
+
+        health["checked"] = now
         with PORT_LOCK:
-            config = campaign.config
-            config_hash = LegionWorkerManager._get_config_hash(config)
+            # The worker may have been dropped during the request: don't bring its entry back
+            if port in WORKER_PORTS.values():
+                WORKER_HEALTH[port] = health
+                if health["alive"]:
+                    LegionWorkerManager._start_heartbeat(port)
+        return health
 
-            if config_hash in WORKER_PORTS:
-                port = WORKER_PORTS[config_hash]
-                if LegionWorkerManager.is_worker_alive(port):
-                    print(f"[LegionPower] Found existing worker for config on port {port}.")
-                    campaign.resolved_port = port
-                    return
-                else:
-                    print(f"[LegionPower] Found dead worker on port {port}. Will restart.")
-                    if port in WORKER_PROCESSES: del WORKER_PROCESSES[port]
-
-            port_config = config.get('comfyui.port')
-            if port_config != 'auto':
-                if LegionWorkerManager.is_worker_alive(port_config):
-                    print(f"[LegionPower] Found externally-run worker on specified port {port_config}.")
-                    campaign.resolved_port = port_config
-                    WORKER_PORTS[config_hash] = port_config
+    @staticmethod
+    def _start_heartbeat(port):
+        """Starts the heartbeat of a newly registered worker. Call with PORT_LOCK held."""
+        if port in HEARTBEATS:
+            return
+        HEARTBEATS[port] = threading.Thread(
+            target=LegionWorkerManager._heartbeat, args=(port,), daemon=True, name=f"Legion-Heartbeat-{port}"
+        )
+        HEARTBEATS[port].start()
+
+    @staticmethod
+    def _heartbeat(port):
+        # Runs while the worker is registered and alive. A forgotten worker ends its heartbeat; so does
+        # a dead one (its process exited, or several beats missed): probes on demand take over from there
+        me = threading.current_thread()
+        started = time.monotonic()
+        while True:
+            with PORT_LOCK:
+                if HEARTBEATS.get(port) is not me:
+                    return # Forgotten, maybe replaced by the heartbeat of a new worker on the port
+                if port not in WORKER_PORTS.values():
+                    HEARTBEATS.pop(port, None)
+                    WORKER_HEALTH.pop(port, None)
                     return
+            health = LegionWorkerManager._probe_health(port)
+
+            process = WORKER_PROCESSES.get(port)
+            exited = process is not None and process.poll() is not None
+            silent_for = health["checked"] - (health["last_seen"] or started)
+            if exited or (not health["alive"] and silent_for > LegionWorkerManager._health_max_age()):
+                with PORT_LOCK:
+                    if HEARTBEATS.get(port) is me:
+                        HEARTBEATS.pop(port, None)
+                print(f"[LegionPower] Worker on port {port} is not responding: heartbeat stopped.")
+                return
+            time.sleep(LegionWorkerManager._heartbeat_interval())
+
+    @staticmethod
+    def get_pool_status(config):
+        """
+        Ready workers of a config's pool and how far it may grow. Cheap: no health probe.
+        """
+        config_hash = LegionWorkerManager._get_config_hash(config)
+        ready = sum(1 for key in list(WORKER_PORTS) if key.partition('#')[0] == config_hash)
+        return {"ready": ready, "max_replicas": LegionWorkerManager._get_pool_settings(config)["max_replicas"]}
+
+    @staticmethod
+    def _replica_key(config_hash, index):
+        # Replica 0 keeps the plain config hash, so single-worker configs are registered as before
+        return config_hash if index == 0 else f"{config_hash}#{index}"
+
+    @staticmethod
+    def _get_pool_settings(config):
+        """
+        Reads 'execution.pool' from a legion config. Pools need 'port: auto': a fixed port is one worker.
+        """
+        min_replicas = max(1, int(config.get('execution.pool.min_replicas', 1) or 1))
+        max_replicas = max(min_replicas, int(config.get('execution.pool.max_replicas', min_replicas) or min_replicas))
+
+        if config.get('comfyui.port') != 'auto':
+            min_replicas = max_replicas = 1
+
+        return {
+            "min_replicas": min_replicas,
+            "max_replicas": max_replicas,
+            "split_devices": bool(config.get('execution.pool.split_devices', False)),
+            "dispatch": config.get('execution.pool.dispatch', 'local') or 'local',
+        }
+
+    @staticmethod
+    def _get_replica_env(config, index, pool):
+        """
+        With 'split_devices', replica N only sees device N (round-robin) of execution.env_vars.CUDA_VISIBLE_DEVICES.
+        """
+        if not pool["split_devices"]:
+            return {}
+
+        env_vars = config.get('execution.env_vars') or {}
+        devices = [d.strip() for d in str(env_vars.get('CUDA_VISIBLE_DEVICES', '')).split(',') if d.strip()]
+        if not devices:
+            return {}
+
+        return {"CUDA_VISIBLE_DEVICES": devices[index % len(devices)]}
+
+    @staticmethod
+    def _forget_worker(port):
+        if port in WORKER_PROCESSES: del WORKER_PROCESSES[port]
+        HEARTBEATS.pop(port, None) # Its heartbeat sees it and ends
+        WORKER_OUTPUTS.pop(port, None)
+        WORKER_HEALTH.pop(port, None)
+        WORKER_INFLIGHT.pop(port, None)
+        WORKER_LAST_USED.pop(port, None)
+        WORKER_CONNECTIONS.close(port)
+
+    @staticmethod
+    def _config_sync(config_hash) -> ConfigSync:
+        sync = CONFIG_SYNC.get(config_hash)
+        if sync is None:
+            sync = CONFIG_SYNC.setdefault(config_hash, ConfigSync()) # setdefault is atomic: one object wins
+        return sync
+
+    @staticmethod
+    def _get_port_config_hash(port):
+        for key, registered_port in list(WORKER_PORTS.items()):
+            if registered_port == port:
+                return key.partition('#')[0]
+        return None
+
+    @staticmethod
+    def _unregister_worker(port, reason):
+        """
+        Removes a worker launched by us from every registry and returns its process, to be
+        stopped with _stop_process(). Call with PORT_LOCK held.
+        """
+        print(f"[LegionPower] Shutting down worker on port {port} ({reason})...")
+        process = WORKER_PROCESSES.get(port)
+        for key in [key for key, registered_port in WORKER_PORTS.items() if registered_port == port]:
+            del WORKER_PORTS[key]
+        LegionWorkerManager._forget_worker(port)
+        return process
+
+    @staticmethod
+    def _stop_process(process):
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    @staticmethod
+    def _get_idle_workers():
+        """
+        Ports of the ready workers launched by us with no campaign in flight, least recently used first.
+        Workers kept for their pool (see _is_kept) are left out.
+        """
+        registered = set(WORKER_PORTS.values())
+        idle = [port for port in list(WORKER_PROCESSES)
+                if port in registered and WORKER_INFLIGHT.get(port, 0) == 0 and not LegionWorkerManager._is_kept(port)]
+        return sorted(idle, key=lambda port: WORKER_LAST_USED.get(port, 0.0))
+
+    @staticmethod
+    def _keep_replicas(config_hash, count):
+        """Spares up to 'count' replicas of a config from idle shutdown and eviction."""
+        if KEPT_REPLICAS.get(config_hash, 0) < count:
+            with PORT_LOCK:
+                KEPT_REPLICAS[config_hash] = max(KEPT_REPLICAS.get(config_hash, 0), count)
+
+    @staticmethod
+    def _is_kept(port):
+        """
+        True if the worker's config is down to the replicas it keeps: a pool's min_replicas, or
+        the size of its warm pool. Stopping it would only have it launched again.
+        """
+        config_hash = LegionWorkerManager._get_port_config_hash(port)
+        kept = KEPT_REPLICAS.get(config_hash, 0)
+        if kept == 0:
+            return False
+        registered = sum(1 for key in list(WORKER_PORTS) if key.partition('#')[0] == config_hash)
+        return registered <= kept
+
+    @staticmethod
+    def _start_reaper():
+        """
+        Starts the thread that shuts down workers idle for longer than 'worker.idle_ttl' seconds (0 = never).
+        """
+        global REAPER_STARTED
+        idle_ttl = float(config_manager.get('worker.idle_ttl', 0) or 0)
+        with PORT_LOCK:
+            if idle_ttl <= 0 or REAPER_STARTED:
+                return
+            REAPER_STARTED = True
+
+        threading.Thread(
+            target=LegionWorkerManager._reap_idle_workers, args=(idle_ttl,), daemon=True, name="Legion-Reaper"
+        ).start()
+
+    @staticmethod
+    def _reap_idle_workers(idle_ttl):
+        check_interval = max(1.0, min(60.0, idle_ttl / 4))
+        while True:
+            time.sleep(check_interval)
+            now = time.monotonic()
+            for port in LegionWorkerManager._get_idle_workers():
+                config_hash = LegionWorkerManager._get_port_config_hash(port)
+                if config_hash is None:
+                    continue
+
+                # Under the config's dispatch lock, no campaign can be sent to the worker meanwhile
+                with LegionWorkerManager._config_sync(config_hash).dispatch, PORT_LOCK:
+                    if (WORKER_INFLIGHT.get(port, 0) > 0 or now - WORKER_LAST_USED.get(port, now) < idle_ttl
+                            or LegionWorkerManager._is_kept(port)):
+                        continue
+                    process = LegionWorkerManager._unregister_worker(port, f"idle for more than {idle_ttl:g}s")
+                    PORT_RESERVATIONS.add(port) # not reusable until the process is gone
+
+                LegionWorkerManager._stop_process(process)
+                with PORT_LOCK:
+                    PORT_RESERVATIONS.discard(port)
+
+    @staticmethod
+    def _get_live_replicas(config_hash):
+        """
+        Returns {replica index: port} for the registered replicas of a config, dropping dead ones.
+        """
+        replicas = {}
+        for key, port in list(WORKER_PORTS.items()):
+            base, _, index = key.partition('#')
+            if base != config_hash:
+                continue
+
+            # A cached failure is confirmed with a fresh probe before the worker is dropped
+            if LegionWorkerManager.get_worker_health(port)["alive"] or LegionWorkerManager._probe_health(port)["alive"]:
+                replicas[int(index) if index else 0] = port
+                continue
+
+            with PORT_LOCK:
+                if WORKER_PORTS.get(key) != port:
+                    continue # Another thread already dropped it
+                print(f"[LegionPower] Found dead worker on port {port}. Will restart.")
+                del WORKER_PORTS[key]
+                LegionWorkerManager._forget_worker(port)
+        return replicas
+
+    @staticmethod
+    def _select_replica(replicas, queue_depths, exclude_ports=None):
+        """
+        Picks the least-loaded replica: fewest campaigns in flight from this Master,
+        or the worker's own /queue depth when it is larger (see dispatch: queue).
+        Ports in 'exclude_ports' are avoided unless no other replica is alive.
+        """
+        candidates = [port for port in replicas.values() if port not in (exclude_ports or ())]
+        if not candidates:
+            candidates = list(replicas.values())
+
+        loads = {}
+        for port in candidates:
+            load = WORKER_INFLIGHT.get(port, 0)
+            if queue_depths.get(port) is not None:
+                load = max(load, queue_depths[port])
+            loads[port] = load
+
+        return min(loads, key=loads.get)
+
+    @staticmethod
+    def _grow_pool(config, config_hash, replicas, pool):
+        """
+        Starts background launches for missing replicas: up to min_replicas always,
+        and one more (up to max_replicas) when every replica is busy.
+        """
+        launching = [i for i in range(pool["max_replicas"])
+                     if LegionWorkerManager._replica_key(config_hash, i) in REPLICA_LAUNCHES]
+        free_indexes = [i for i in range(pool["max_replicas"]) if i not in replicas and i not in launching]
+
+        wanted = pool["min_replicas"] - len(replicas) - len(launching)
+        all_busy = all(WORKER_INFLIGHT.get(port, 0) > 0 for port in replicas.values())
+        if all_busy and len(replicas) + len(launching) < pool["max_replicas"]:
+            wanted = max(wanted, 1)
+
+        for index in free_indexes[:max(0, wanted)]:
+            key = LegionWorkerManager._replica_key(config_hash, index)
+            REPLICA_LAUNCHES.add(key)
+            threading.Thread(
+                target=LegionWorkerManager._launch_replica_in_background,
+                args=(config, config_hash, index, pool),
+                daemon=True,
+                name=f"Legion-Launch-{key}",
+            ).start()
 
-            port_to_launch = LegionWorkerManager._get_next_available_port() if port_config == 'auto' else port_config
+    @staticmethod
+    def _launch_replica_in_background(config, config_hash, index, pool):
+        key = LegionWorkerManager._replica_key(config_hash, index)
+        port = None
+        try:
+            with PORT_LOCK:
+                port = LegionWorkerManager._get_next_available_port()
+            LegionWorkerManager._stop_evicted(port)
+
+            # The port stays reserved, so the launch itself needs no lock
+            print(f"[LegionPower] Scaling up pool {config_hash}: replica {index} on port {port}...")
+            process = LegionWorkerManager._spawn_worker(config, port, LegionWorkerManager._get_replica_env(config, index, pool))
+            with PORT_LOCK:
+                WORKER_PROCESSES[port] = process
+
+            # Campaigns keep flowing to the existing replicas meanwhile
+            LegionWorkerManager._wait_for_worker(config, port)
+
+            with PORT_LOCK:
+                WORKER_PORTS[key] = port
+                WORKER_LAST_USED[port] = time.monotonic()
+                LegionWorkerManager._start_heartbeat(port)
+        except Exception as e:
+            print(f"[LegionPower] ERROR: Failed to launch replica {index} of pool {config_hash}: {e}")
+            if port is not None:
+                with PORT_LOCK:
+                    process = WORKER_PROCESSES.get(port)
+                    if process is not None and process.poll() is None:
+                        process.kill()
+                    LegionWorkerManager._forget_worker(port)
+        finally:
+            REPLICA_LAUNCHES.discard(key)
+            if port is not None:
+                with PORT_LOCK:
+                    PORT_RESERVATIONS.discard(port)
 
-            print(f"[LegionPower] Launching new ComfyUI worker instance on port {port_to_launch}...")
+    @staticmethod
+    def ensure_worker_is_alive(campaign, exclude_ports=None):
+        """
+        Resolves the worker for a campaign (launching it if needed) and counts the campaign
+        as in flight on it until release_worker(campaign) is called.
+        'exclude_ports' steers the campaign away from given replicas (e.g. to retry elsewhere).
+        """
+        config = campaign.config
+        config_hash = LegionWorkerManager._get_config_hash(config)
+        pool = LegionWorkerManager._get_pool_settings(config)
+        if pool["max_replicas"] > 1:
+            LegionWorkerManager._keep_replicas(config_hash, pool["min_replicas"])
+        sync = LegionWorkerManager._config_sync(config_hash)
+        waiting = False
+
+        while True:
+            # Fast path, for a config with running workers: no global lock, and this config's
+            # dispatch lock only around the bookkeeping
+            replicas = LegionWorkerManager._get_live_replicas(config_hash)
+            if replicas:
+                print(f"[LegionPower] Found {len(replicas)} existing worker(s) for config on port(s) {sorted(replicas.values())}.")
+                queue_depths = {}
+                if pool["dispatch"] == "queue":
+                    queue_depths = {port: LegionWorkerManager.get_worker_health(port)["queue_depth"] for port in replicas.values()}
+
+                with sync.dispatch:
+                    # The idle reaper and LRU eviction unregister workers under this lock: drop the
+                    # replicas they took since the snapshot, so none is picked after being stopped
+                    replicas = {index: port for index, port in replicas.items()
+                                if WORKER_PORTS.get(LegionWorkerManager._replica_key(config_hash, index)) == port}
+                    if replicas:
+                        LegionWorkerManager._grow_pool(config, config_hash, replicas, pool)
+
+                        port = LegionWorkerManager._select_replica(replicas, queue_depths, exclude_ports)
+                        campaign.resolved_port = port
+                        WORKER_INFLIGHT[port] = WORKER_INFLIGHT.get(port, 0) + 1
+                        WORKER_LAST_USED[port] = time.monotonic()
+                        campaign.holds_worker = True
+                        return
+                continue # All of them went away meanwhile: look again
+
+            if LegionWorkerManager._is_launching(config_hash):
+                # A background launch (warm pool or scale-up) is already starting this config:
+                # adopt it instead of starting a duplicate
+                if not waiting:
+                    print(f"[LegionPower] Waiting for the worker of config {config_hash} that is already starting...")
+                    waiting = True
+                time.sleep(0.25)
+                continue
+
+            # No worker yet: the first campaign launches it while the others with this config
+            # wait on the same lock, then find it running. Other configs are not held up.
+            with sync.launch:
+                registered = any(key.partition('#')[0] == config_hash for key in list(WORKER_PORTS))
+                if not registered and not LegionWorkerManager._is_launching(config_hash):
+                    LegionWorkerManager._start_first_worker(config, config_hash, pool)
 
+    @staticmethod
+    def _is_launching(config_hash):
+        return any(key.partition('#')[0] == config_hash for key in list(REPLICA_LAUNCHES))
 
-            python_executable = config.get('comfyui.paths.python_executable')
-            if not python_executable:
-                python_executable = sys.executable # Use the same Python as the Master
+    @staticmethod
+    def is_worker_process():
+        """
+        True inside a worker launched by a Master: it loads this plugin and reads the same
+        config.yaml, but must not launch workers (or serve the Master's APIs) of its own.
+        """
+        return os.environ.get(WORKER_ENV_MARKER) == "1"
+
+    @staticmethod
+    def start_warm_pool():
+        """
+        Launches the workers listed under 'warm_pool' in config.yaml, in the background.
+        Ready workers are registered under their config hash, so the first campaign with
+        the same config finds them like any other running worker. Does nothing in a worker.
+        """
+        global WARM_POOL_STARTED
+        if LegionWorkerManager.is_worker_process():
+            return
+
+        with PORT_LOCK:
+            if WARM_POOL_STARTED:
+                return
+            WARM_POOL_STARTED = True
+
+        entries = config_manager.get('warm_pool', []) or []
+        if not entries:
+            return
+
+        threading.Thread(
+            target=LegionWorkerManager._launch_warm_pool, args=(entries,), daemon=True, name="Legion-WarmPool"
+        ).start()
+
+    @staticmethod
+    def _launch_warm_pool(entries):
+        import yaml
+        from ..core.legion_datatypes import LegionConfig
+        from ..legion_config_manager import find_file_in_roots
+
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"config": entry}
+            name = entry.get("config")
+
+            try:
+                config_path = find_file_in_roots(name, "paths.legion_configs_roots")
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = LegionConfig(**(yaml.safe_load(f) or {}))
+            except Exception as e:
+                print(f"[LegionPower] WARNING: Warm pool config '{name}' skipped: {e}")
+                continue
+
+            if config.get('comfyui.port') != 'auto':
+                print(f"[LegionPower] WARNING: Warm pool config '{name}' skipped: only 'port: auto' configs can be pre-launched.")
+                continue
+
+            config_hash = LegionWorkerManager._get_config_hash(config)
+            pool = LegionWorkerManager._get_pool_settings(config)
+            replicas = max(1, int(entry.get("replicas", pool["min_replicas"]) or 1))
+            LegionWorkerManager._keep_replicas(config_hash, replicas)
+            print(f"[LegionPower] Warm pool: starting {replicas} worker(s) for '{name}' ({config_hash})...")
+
+            for index in range(replicas):
+                key = LegionWorkerManager._replica_key(config_hash, index)
+                with LegionWorkerManager._config_sync(config_hash).dispatch:
+                    if key in WORKER_PORTS or key in REPLICA_LAUNCHES:
+                        continue
+                    REPLICA_LAUNCHES.add(key)
+
+                threading.Thread(
+                    target=LegionWorkerManager._launch_replica_in_background,
+                    args=(config, config_hash, index, pool),
+                    daemon=True,
+                    name=f"Legion-Launch-{key}",
+                ).start()
+
+    @staticmethod
+    def release_worker(campaign):
+        """
+        Marks a campaign as no longer in flight on its worker. Safe to call more than once.
+        """
+        if not getattr(campaign, 'holds_worker', False):
+            return
+
+        config_hash = LegionWorkerManager._get_config_hash(campaign.config)
+        with LegionWorkerManager._config_sync(config_hash).dispatch:
+            if not campaign.holds_worker:
+                return
+            campaign.holds_worker = False
+            port = campaign.resolved_port
+            if port in WORKER_INFLIGHT:
+                WORKER_INFLIGHT[port] = max(0, WORKER_INFLIGHT[port] - 1)
+                WORKER_LAST_USED[port] = time.monotonic()
+
+    @staticmethod
+    def _start_first_worker(config, config_hash, pool):
+        """
+        Brings up replica 0 of a config (blocking) and returns its port.
+        Global registries are only locked for the moments they change, not during the startup.
+        """
+        port_config = config.get('comfyui.port')
+        if port_config != 'auto':
+            if LegionWorkerManager.is_worker_alive(port_config):
+                print(f"[LegionPower] Found externally-run worker on specified port {port_config}.")
+                with PORT_LOCK:
+                    WORKER_PORTS[config_hash] = port_config
+                    LegionWorkerManager._start_heartbeat(port_config)
+                return port_config
+            port_to_launch = port_config
+        else:
+            with PORT_LOCK:
+                port_to_launch = LegionWorkerManager._get_next_available_port()
 
-            main_py_path = config.get('comfyui.paths.comfyui_path')
-            if main_py_path:
-                main_py_path = main_py_path / "main.py"
+        try:
+            LegionWorkerManager._stop_evicted(port_to_launch)
+            process = LegionWorkerManager._spawn_worker(config, port_to_launch, LegionWorkerManager._get_replica_env(config, 0, pool))
+            with PORT_LOCK:
+                WORKER_PROCESSES[port_to_launch] = process
+
+            LegionWorkerManager._wait_for_worker(config, port_to_launch)
+
+            with PORT_LOCK:
+                WORKER_PORTS[config_hash] = port_to_launch
+                WORKER_LAST_USED[port_to_launch] = time.monotonic()
+                LegionWorkerManager._start_heartbeat(port_to_launch)
+        except Exception:
+            with PORT_LOCK:
+                process = WORKER_PROCESSES.get(port_to_launch)
+                if process is not None and process.poll() is None:
+                    process.kill()
+                LegionWorkerManager._forget_worker(port_to_launch)
+            raise
+        finally:
+            with PORT_LOCK:
+                PORT_RESERVATIONS.discard(port_to_launch)
+        return port_to_launch
+
+    @staticmethod
+    def _spawn_worker(config, port_to_launch, env_overrides=None):
+        """
+        Launches a ComfyUI worker process on the given port and returns the Popen object.
+        """
+        print(f"[LegionPower] Launching new ComfyUI worker instance on port {port_to_launch}...")
+
+
+        python_executable = config.get('comfyui.paths.python_executable')
+        if not python_executable:
+            python_executable = sys.executable # Use the same Python as the Master
+
+        main_py_path = config.get('comfyui.paths.comfyui_path')
+        if main_py_path:
+            main_py_path = main_py_path / "main.py"
+        else:
+            main_py_path = COMFYUI_ROOT_PATH / "main.py"
+
+        print(f"[LegionPower]  - Python executable: {python_executable}")
+        print(f"[LegionPower]  - Main.py path: {main_py_path}")
+
+        command = [
+            python_executable,
+            str(main_py_path),
+            '--port', str(port_to_launch),
+            '--disable-auto-launch',
+            # No --dont-print-server: its "To see the GUI go to:" line tells the output reader that startup is over
+        ]
+
+        # Handle extra_args
+        extra_args = config.get("execution.extra_args")
+        if extra_args:
+            if isinstance(extra_args, str):
+                # Split string into args (respects quotes)
+                extra_args_list = shlex.split(extra_args)
+                command.extend(extra_args_list)
+                print(f"[LegionPower]  - Added extra args: {extra_args}")
+            elif isinstance(extra_args, list):
+                command.extend(extra_args)
+                print(f"[LegionPower]  - Added extra args: {' '.join(extra_args)}")
+
+        # Environment variables handling
+        env = os.environ.copy() # Copy Master process environment
+        env[WORKER_ENV_MARKER] = "1" # The worker loads this plugin too: no warm pool of its own
+
+        # Apply custom environment variables from config, then per-replica overrides
+        custom_env_vars = config.get("execution.env_vars")
+        if custom_env_vars and isinstance(custom_env_vars, dict):
+            for key, value in custom_env_vars.items():
+                env[key] = str(value)
+                print(f"[LegionPower]  - Set env var: {key}={value}")
+
+        for key, value in (env_overrides or {}).items():
+            env[key] = str(value)
+            print(f"[LegionPower]  - Set replica env var: {key}={value}")
+
+        print(f"[LegionPower]  - CWD: {COMFYUI_ROOT_PATH}")
+        print(f"[LegionPower]  - Command: {' '.join(command)}")
+
+        # Launch the process with correct CWD and environment
+        # Output goes through a pipe: it is still echoed to the console, and tells us when startup is over
+        process = subprocess.Popen(
+            command,
+            cwd=COMFYUI_ROOT_PATH,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        WORKER_OUTPUTS[port_to_launch] = WorkerOutputReader(process, port_to_launch)
+
+        print(f"[LegionPower] Worker process launched with PID: {process.pid}. Waiting for it to come online...")
+        LegionWorkerManager._start_reaper()
+        return process
+
+    @staticmethod
+    def _wait_for_worker(config, port_to_launch):
+        """
+        Blocks until the worker on the given port answers. Raises as soon as its process exits,
+        with the last lines of its output, or after the startup timeout.
+        """
+        # Get startup timeout - priority: legion_config > global config > default 300s
+        startup_timeout = config.get('execution.startup_timeout')  # Try legion config first
+        if startup_timeout is None or startup_timeout == "":
+            # Fallback to global config
+            startup_timeout = config_manager.get('worker.startup_timeout', 300)
+
+        startup_timeout = int(startup_timeout)  # Ensure it's an integer
+        print(f"[LegionPower]  - Startup timeout: {startup_timeout}s")
+
+        process = WORKER_PROCESSES.get(port_to_launch)
+        output = WORKER_OUTPUTS.get(port_to_launch)
+        started = time.monotonic()
+        check_interval = 0.05 # grows up to 0.5s: fast launches are noticed quickly, slow ones are not hammered
+
+        while time.monotonic() - started < startup_timeout:
+            if process is not None and process.poll() is not None:
+                tail = output.tail() if output else ""
+                raise RuntimeError(
+                    f"Worker on port {port_to_launch} exited with code {process.returncode} during startup."
+                    + (f" Last output:\n{tail}" if tail else "")
+                )
+
+            # The server-listening line or an accepted connection means HTTP is up; /queue confirms it
+            listening = (output is not None and output.ready.is_set()) or LegionWorkerManager._port_accepts(port_to_launch)
+            if listening and LegionWorkerManager.is_worker_alive(port_to_launch):
+                print(f"[LegionPower] Worker on port {port_to_launch} is now online (started in {time.monotonic() - started:.1f}s)")
+                return
+
+            if output is not None and not output.ready.is_set():
+                output.ready.wait(check_interval)
             else:
-                main_py_path = COMFYUI_ROOT_PATH / "main.py"
-
-            print(f"[LegionPower]  - Python executable: {python_executable}")
-            print(f"[LegionPower]  - Main.py path: {main_py_path}")
-
-            command = [
-                python_executable,
-                str(main_py_path),
-                '--port', str(port_to_launch),
-                '--disable-auto-launch',
-                '--dont-print-server',
-            ]
-
-            # Handle extra_args
-            extra_args = config.get("execution.extra_args")
-            if extra_args:
-                if isinstance(extra_args, str):
-                    # Split string into args (respects quotes)
-                    extra_args_list = shlex.split(extra_args)
-                    command.extend(extra_args_list)
-                    print(f"[LegionPower]  - Added extra args: {extra_args}")
-                elif isinstance(extra_args, list):
-                    command.extend(extra_args)
-                    print(f"[LegionPower]  - Added extra args: {' '.join(extra_args)}")
-
-            # Environment variables handling
-            env = os.environ.copy() # Copy Master process environment
-
-            # Apply custom environment variables from config
-            custom_env_vars = config.get("execution.env_vars")
-            if custom_env_vars and isinstance(custom_env_vars, dict):
-                for key, value in custom_env_vars.items():
-                    env[key] = str(value)
-                    print(f"[LegionPower]  - Set env var: {key}={value}")
-
-            print(f"[LegionPower]  - CWD: {COMFYUI_ROOT_PATH}")
-            print(f"[LegionPower]  - Command: {' '.join(command)}")
-
-            # Launch the process with correct CWD and environment
-            process = subprocess.Popen(
-                command,
-                cwd=COMFYUI_ROOT_PATH,
-                env=env
-            )
-
-            WORKER_PROCESSES[port_to_launch] = process
-            WORKER_PORTS[config_hash] = port_to_launch
-            campaign.resolved_port = port_to_launch
-
-            print(f"[LegionPower] Worker process launched with PID: {process.pid}. Waiting for it to come online...")
-
-            # Get startup timeout - priority: legion_config > global config > default 300s
-            startup_timeout = config.get('execution.startup_timeout')  # Try legion config first
-            if startup_timeout is None or startup_timeout == "":
-                # Fallback to global config
-                startup_timeout = config_manager.get('worker.startup_timeout', 300)
-
-            startup_timeout = int(startup_timeout)  # Ensure it's an integer
-            check_interval = 1.5  # seconds between checks
-            max_checks = int(startup_timeout / check_interval)
-
-            print(f"[LegionPower]  - Startup timeout: {startup_timeout}s (~{max_checks} checks)")
-
-            for check_num in range(max_checks):
-                if LegionWorkerManager.is_worker_alive(port_to_launch):
-                    elapsed = check_num * check_interval
-                    print(f"[LegionPower] Worker on port {port_to_launch} is now online (started in {elapsed:.1f}s)")
-                    return
                 time.sleep(check_interval)
+            check_interval = min(check_interval * 2, 0.5)
+
+        tail = output.tail() if output else ""
+        raise RuntimeError(
+            f"Worker on port {port_to_launch} failed to start within {startup_timeout}s timeout."
+            + (f" Last output:\n{tail}" if tail else "")
+        )
 
-            raise RuntimeError(f"Worker on port {port_to_launch} failed to start within {startup_timeout}s timeout.")
+    @staticmethod
+    def _port_accepts(port):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return True
+        except OSError:
+            return False
 
     @staticmethod
     def _get_next_available_port():
+        """
+        Picks a free port in [start_port, start_port + max_workers) and reserves it: the caller
+        must discard it from PORT_RESERVATIONS once its launch is over. Call with PORT_LOCK held.
+        """
         start_port = config_manager.get('ports.start_port')
         max_workers = config_manager.get('ports.max_workers')
-        for i in range(max_workers):
-            port = start_port + i
-            if port not in WORKER_PROCESSES and not LegionWorkerManager.is_worker_alive(port):
-                return port
-        raise ConnectionError("No available ports found for new workers.")
\ No newline at end of file
+
+        taken = set(WORKER_PROCESSES) | set(WORKER_PORTS.values()) | PORT_RESERVATIONS
+        candidates = (port for port in range(start_port, start_port + max_workers)
+                      if port not in taken and LegionWorkerManager._port_is_free(port))
+
+        if config_manager.get('ports.connect_probe', False):
+            # Also skip ports where something accepts connections without holding a local socket
+            # (e.g. forwarded from a container or WSL); the range is probed in parallel
+            candidates = list(candidates)
+            answering = LegionWorkerManager._probe_ports(candidates)
+            candidates = (port for port in candidates if port not in answering)
+
+        port = next(candidates, None)
+
+        if port is None:
+            # Every port is taken: make room by evicting the least recently used idle worker
+            port = LegionWorkerManager._evict_idle_worker(f"least recently used, ports.max_workers ({max_workers}) reached")
+            if port is None:
+                raise ConnectionError("No available ports found for new workers (every worker is busy).")
+
+        PORT_RESERVATIONS.add(port)
+        return port
+
+    @staticmethod
+    def _evict_idle_worker(reason):
+        """
+        Unregisters the least recently used idle worker and returns its port, or None. Call with
+        PORT_LOCK held. The process is not stopped here (that can take seconds): it is left in
+        EVICTED_PROCESSES for the launch that takes the port, see _stop_evicted().
+        """
+        for port in LegionWorkerManager._get_idle_workers():
+            config_hash = LegionWorkerManager._get_port_config_hash(port)
+            if config_hash is None:
+                continue
+            dispatch_lock = LegionWorkerManager._config_sync(config_hash).dispatch
+
+            # PORT_LOCK is held, so only try the dispatch lock (lock order): a busy config is skipped
+            if not dispatch_lock.acquire(blocking=False):
+                continue
+            try:
+                if WORKER_INFLIGHT.get(port, 0) > 0 or LegionWorkerManager._is_kept(port):
+                    continue
+                EVICTED_PROCESSES[port] = LegionWorkerManager._unregister_worker(port, reason)
+            finally:
+                dispatch_lock.release()
+            return port
+        return None
+
+    @staticmethod
+    def _stop_evicted(port):
+        """
+        Stops the worker evicted to free 'port', if any, before a new worker is launched on it.
+        Call without PORT_LOCK: it waits for the old process to exit.
+        """
+        with PORT_LOCK:
+            process = EVICTED_PROCESSES.pop(port, None)
+        LegionWorkerManager._stop_process(process)
+
+    @staticmethod
+    def _port_is_free(port):
+        """
+        Local bind test: fails for a port held by any process, a worker of ours or not.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if os.name != 'nt':
+                # Like the worker's own server, accept a port whose old connections are in TIME_WAIT
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind(("", port))
+                return True
+            except OSError:
+                return False
+
+    @staticmethod
+    def _probe_ports(ports):
+        """
+        Returns the ports among 'ports' that accept a TCP connection, all probed at once.
+        """
+        if not ports:
+            return set()
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(32, len(ports)), thread_name_prefix="Legion-PortProbe") as executor:
+            accepts = list(executor.map(LegionWorkerManager._port_accepts, ports))
+        return {port for port, accepted in zip(ports, accepts) if accepted}
@@ -0,0 +1,37 @@
+# src/comfyui_legion_power/helpers/worker_output.py
+
+import collections
+import sys
+import threading
+
+# Lines ComfyUI prints once its HTTP server is listening (workers are launched without --dont-print-server)
+READY_MARKERS = ("To see the GUI go to:", "Starting server")
+
+
+class WorkerOutputReader:
+    """
+    Drains a worker's combined stdout/stderr pipe on a background thread.
+
+    Every line is echoed to the Master's console as before, the last 'tail_size' lines are
+    kept to explain a failed startup, and 'ready' is set as soon as the server-listening
+    line shows up.
+    """
+
+    def __init__(self, process, port, tail_size: int = 50):
+        self.process = process
+        self.port = port
+        self.ready = threading.Event()
+        self._tail = collections.deque(maxlen=tail_size)
+        self._thread = threading.Thread(target=self._read, daemon=True, name=f"Legion-Output-{port}")
+        self._thread.start()
+
+    def _read(self):
+        for line in iter(self.process.stdout.readline, ''):
+            self._tail.append(line.rstrip('\n'))
+            sys.stdout.write(line)
+            if not self.ready.is_set() and any(marker in line for marker in READY_MARKERS):
+                self.ready.set()
+        self.process.stdout.close()
+
+    def tail(self, lines: int = 20) -> str:
+        return "\n".join(list(self._tail)[-lines:])
@@ -61,18 +61,44 @@ class LegionConfigManager:
         return {
             'ports': {
                 'start_port': 8200,
-                'max_workers': 20
+                'max_workers': 20,
+                'connect_probe': False
             },
             'worker': {
-                'startup_timeout': 300
+                'startup_timeout': 300,
+                'http_pool_size': 8,
+                'heartbeat_interval': 2,
+                'idle_ttl': 0
             },
+            'campaigns': {
+                'max_concurrent': 32,
+                'max_per_worker': 4
+            },
+            'serialization': {
+                'png_workers': 0,
+                'png_chunk_size': 8,
+                'dedup_inputs': True,
+                'blob_cache_mb': 1024
+            },
+            'data_exchange': {
+                'content_ttl': 3600
+            },
+            'result_cache': {
+                'enabled': False,
+                'max_size_mb': 2048
+            },
+            'warm_pool': [],
             'paths': {
                 'worker_templates_dir': str(LEGION_RUNTIME_PATH / 'ComfyUIs'),
                 'workflows_roots': [
                     str(LEGION_RUNTIME_PATH / 'workflows'),
                     str(COMFYUI_ROOT_PATH / 'workflows')
                 ],
+                'legion_configs_roots': [
+                    str(LEGION_RUNTIME_PATH / 'configs')
+                ],
                 'temp_root_dir': str(LEGION_RUNTIME_PATH / 'temp'),
+                'result_cache_dir': str(LEGION_RUNTIME_PATH / 'result_cache'),
             },
             'logging': {
                 'level': 'INFO'
@@ -2,9 +2,12 @@
 
 import os
 from pathlib import Path
-import json
 from ..core.legion_datatypes import any
-from ..core.serializer_manager import get_serializer_for_data
+from ..core.serializer_manager import (
+    get_serializer_for_data, serialize_to_manifest_entry, write_manifest,
+    load_exchange_options, OUTPUT_MANIFEST_NAME, PARTIAL_MANIFEST_NAME,
+)
+from ..core.serializers.chunked_serializer import ChunkedSerializer
 from ..legion_config_manager import LEGION_RUNTIME_PATH
 
 
@@ -49,6 +52,15 @@ class LegionExporterNode:
 
         outputs_path.mkdir(parents=True, exist_ok=True)
 
+        # Serialize outputs with the same data exchange options the Master used for the inputs
+        exchange_options = load_exchange_options(run_path)
+
+        # Long batches are written in chunks announced in the partial manifest, so the Master
+        # decodes them while the rest is still being written. Start it afresh on every run
+        chunk_size = int(exchange_options.get("chunk_size") or 0)
+        partial_manifest_path = outputs_path / PARTIAL_MANIFEST_NAME
+        partial_manifest_path.unlink(missing_ok=True)
+
         manifest = {}
 
         # Process all connected inputs (input_1, input_2, etc.)
@@ -57,7 +69,7 @@ class LegionExporterNode:
                 continue
 
             print(f"[Legion Exporter] Processing input '{name}'...")
-            serializer = get_serializer_for_data(data)
+            serializer = get_serializer_for_data(data, exchange_options)
 
             if serializer is None:
                 print(f"[Legion Exporter] WARNING: Unsupported data type for input '{name}' ({type(data).__name__}). Skipping.")
@@ -65,12 +77,8 @@ class LegionExporterNode:
 
             # For primitives, the value is stored directly in the manifest
             if getattr(serializer, 'IS_PRIMITIVE', False):
-                value = serializer.serialize(data, "") # Path is not needed
-                manifest[name] = {
-                    "type": serializer.TYPE_NAME,
-                    "value": value
-                }
-                print(f"[Legion Exporter]  - Stored primitive value: {value}")
+                manifest[name] = serialize_to_manifest_entry(serializer, data, "", name) # Path is not needed
+                print(f"[Legion Exporter]  - Stored primitive value: {manifest[name]['value']}")
             else:
                 # For file-based types, we serialize to a subfolder
                 output_subpath = Path(outputs_path / name).resolve()
@@ -81,19 +89,20 @@ class LegionExporterNode:
                         f"[Legion Exporter] ERROR: Output path '{output_subpath}' is outside allowed directory '{allowed_root}'."
                     )
 
-                # The serializer will save the data to the given path
-                serializer.serialize(data, output_subpath)
+                if chunk_size > 0 and getattr(serializer, 'CHUNKABLE', False) and data.shape[0] > chunk_size:
+                    serializer = ChunkedSerializer(
+                        exchange_options, inner=serializer, chunk_size=chunk_size,
+                        partial_manifest_path=partial_manifest_path, name=name,
+                    )
 
-                manifest[name] = {
-                    "type": serializer.TYPE_NAME,
-                    "path": name # Relative path within the 'outputs' directory
-                }
+                # The serializer will save the data to the given path
+                # (relative path within the 'outputs' directory goes in the manifest)
+                manifest[name] = serialize_to_manifest_entry(serializer, data, output_subpath, name)
                 print(f"[Legion Exporter]  - Serialized data to subfolder: {name}")
 
         # Write the final manifest file
-        manifest_path = run_path / "outputs" / "manifest_output.json"
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2)
+        manifest_path = run_path / "outputs" / OUTPUT_MANIFEST_NAME
+        write_manifest(manifest_path, manifest)
 
         print(f"[Legion Exporter] Output manifest written to: {manifest_path}")
 
@@ -1,9 +1,8 @@
 # src/comfyui_legion_power/nodes/legion_importer.py
 
 from pathlib import Path
-import json
 from ..core.legion_datatypes import any
-from ..core.serializer_manager import SERIALIZER_CLASSES
+from ..core.serializer_manager import read_manifest, deserialize_manifest, INPUT_MANIFEST_NAME
 
 
 class LegionImporterNode:
@@ -26,43 +25,16 @@ class LegionImporterNode:
 
         # data_exchange_root already points to the run-specific directory (e.g., temp/{run_id}/)
         run_path = Path(data_exchange_root)
-        manifest_path = run_path / "inputs" / "manifest_input.json"
+        manifest_path = run_path / "inputs" / INPUT_MANIFEST_NAME
 
         if not manifest_path.exists():
             raise FileNotFoundError(f"Input manifest not found! Expected at: {manifest_path}")
 
-        with open(manifest_path, 'r', encoding='utf-8') as f:
-            manifest = json.load(f)
+        manifest = read_manifest(manifest_path)
 
         print(f"[Legion Importer] Loaded input manifest from: {manifest_path}")
 
-        deserialized_outputs = {}
-
-        # Create a mapping from TYPE_NAME to the serializer class for quick lookup
-        serializer_map = {s.TYPE_NAME: s for s in SERIALIZER_CLASSES}
-
-        for name, info in manifest.items():
-            output_data = None
-            serializer_type = info.get("type")
-
-            if serializer_type not in serializer_map:
-                print(f"[Legion Importer] WARNING: Unknown serializer type '{serializer_type}' for input '{name}'. Skipping.")
-                continue
-
-            # Get an instance of the correct deserializer
-            deserializer = serializer_map[serializer_type]()
-
-            if "value" in info:
-                # Primitive type, the value is in the manifest itself
-                output_data = deserializer.deserialize(info["value"])
-                print(f"[Legion Importer]  - Deserialized primitive '{name}': {output_data}")
-            elif "path" in info:
-                # File-based type
-                source_path = run_path / "inputs" / info["path"]
-                output_data = deserializer.deserialize(str(source_path.resolve()))
-                print(f"[Legion Importer]  - Deserialized '{name}' from path: {source_path}")
-
-            deserialized_outputs[name] = output_data
+        deserialized_outputs = deserialize_manifest(manifest, run_path / "inputs", log_prefix="[Legion Importer]")
 
         # Map input_X to output_X
         # The Master serializes as input_1, input_2, etc.
@@ -1,9 +1,9 @@
 # src/comfyui_legion_power/nodes/legion_join.py
 
-import json
-from pathlib import Path
 from ..core.legion_datatypes import LEGION_CAMPAIGN, any
-from ..core.serializer_manager import SERIALIZER_CLASSES
+from ..core.serializer_manager import read_manifest, deserialize_manifest, OUTPUT_MANIFEST_NAME
+from ..helpers.campaign_engine import wait_for_campaigns
+from ..helpers.chunk_collector import ChunkCollector
 
 
 class LegionJoinNode:
@@ -40,54 +40,46 @@ class LegionJoinNode:
                 print(f"[Legion Join] WARNING: Sync campaign has no stored outputs!")
                 return (None, None, None, None, None)
 
-        # Async campaign: wait for execution thread and read from files
-        if hasattr(legion_campaign, 'execution_thread') and legion_campaign.execution_thread:
+        from ..helpers.file_manager import LegionFileManager
+        file_manager = LegionFileManager.for_campaign(legion_campaign)
+
+        # Async campaign: wait for its future and read from files
+        collector = None
+        if getattr(legion_campaign, 'future', None) is not None:
+            # Chunked outputs are decoded while the worker is still writing the rest
+            if legion_campaign.config.get("data_exchange.chunk_size"):
+                collector = ChunkCollector(file_manager.run_path / "outputs", log_prefix="[Legion Join]")
+
             print(f"[Legion Join] Waiting for async execution to complete...")
-            legion_campaign.execution_thread.join()  # Block until thread completes
+            try:
+                wait_for_campaigns([legion_campaign])  # Block until the engine finishes it
+            finally:
+                if collector is not None:
+                    collector.stop()
             print(f"[Legion Join] Async execution completed!")
 
         # Check campaign status
         if legion_campaign.status == "FAILED":
-            raise RuntimeError(f"Campaign {legion_campaign.campaign_id} failed during execution")
+            raise RuntimeError(f"Campaign {legion_campaign.campaign_id} failed during execution: {legion_campaign.error}")
 
         if legion_campaign.status not in ["COMPLETED", "DRY_RUN_COMPLETE"]:
             raise RuntimeError(f"Campaign {legion_campaign.campaign_id} has unexpected status: {legion_campaign.status}")
 
         # Deserialize outputs from manifest
-        from ..helpers.file_manager import LegionFileManager
-        file_manager = LegionFileManager(run_id=legion_campaign.campaign_id)
-
-        output_manifest_path = file_manager.run_path / "outputs" / "manifest_output.json"
+        output_manifest_path = file_manager.run_path / "outputs" / OUTPUT_MANIFEST_NAME
 
         if not output_manifest_path.exists():
             print(f"[Legion Join] WARNING: Output manifest not found at {output_manifest_path}")
             print(f"[Legion Join] Returning None outputs")
             final_outputs = (None, None, None, None, None)
         else:
-            with open(output_manifest_path, 'r', encoding='utf-8') as f:
-                output_manifest = json.load(f)
-
-            deserialized_outputs = {}
-            serializer_map = {s.TYPE_NAME: s for s in SERIALIZER_CLASSES}
-
-            for name, info in output_manifest.items():
-                serializer_type = info.get("type")
-
-                if serializer_type not in serializer_map:
-                    print(f"[Legion Join] WARNING: Unknown serializer type '{serializer_type}' for output '{name}'")
-                    continue
-
-                deserializer = serializer_map[serializer_type]()
-
-                if "value" in info:
-                    # Primitive type
-                    deserialized_outputs[name] = deserializer.deserialize(info["value"])
-                    print(f"[Legion Join]  - Deserialized primitive '{name}'")
-                elif "path" in info:
-                    # File-based type
-                    source_path = file_manager.run_path / "outputs" / info["path"]
-                    deserialized_outputs[name] = deserializer.deserialize(str(source_path.resolve()))
-                    print(f"[Legion Join]  - Deserialized '{name}' from path")
+            output_manifest = read_manifest(output_manifest_path)
+            collected = collector.take_all(output_manifest) if collector is not None else {}
+            deserialized_outputs = deserialize_manifest(
+                {name: info for name, info in output_manifest.items() if name not in collected},
+                file_manager.run_path / "outputs", log_prefix="[Legion Join]"
+            )
+            deserialized_outputs.update(collected)
 
             # Note: LegionExporter uses input_X naming for its inputs
             final_outputs = (
@@ -1,6 +1,7 @@
 # src/comfyui_legion_power/nodes/legion_join_all.py
 
 from ..core.legion_datatypes import LEGION_CAMPAIGN
+from ..helpers.campaign_engine import wait_for_campaigns
 
 
 class LegionJoinAllNode:
@@ -24,17 +25,17 @@ class LegionJoinAllNode:
         campaigns = [c for c in kwargs.values() if c is not None]
         print(f"[Legion Join All] Joining all {len(campaigns)} campaigns...")
 
-        # Wait for all async execution threads
-        for i, campaign in enumerate(campaigns, 1):
-            if hasattr(campaign, 'execution_thread') and campaign.execution_thread:
-                print(f"[Legion Join All] Waiting for campaign {i}/{len(campaigns)} (ID: {campaign.campaign_id})...")
-                campaign.execution_thread.join()  # Block until this thread completes
-                print(f"[Legion Join All] Campaign {i}/{len(campaigns)} completed")
+        # Wait for all async campaign futures at once (they run concurrently on the engine)
+        pending = [c for c in campaigns if getattr(c, 'future', None) is not None]
+        if pending:
+            print(f"[Legion Join All] Waiting for {len(pending)} async campaign(s)...")
+            wait_for_campaigns(pending)
+            print(f"[Legion Join All] All async campaigns finished")
 
         # Check all campaigns succeeded
         for campaign in campaigns:
             if campaign.status == "FAILED":
-                raise RuntimeError(f"Campaign {campaign.campaign_id} failed during execution")
+                raise RuntimeError(f"Campaign {campaign.campaign_id} failed during execution: {campaign.error}")
             if campaign.status not in ["COMPLETED", "DRY_RUN_COMPLETE"]:
                 raise RuntimeError(f"Campaign {campaign.campaign_id} has unexpected status: {campaign.status}")
 
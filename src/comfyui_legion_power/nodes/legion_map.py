@@ -0,0 +1,190 @@
+# src/comfyui_legion_power/nodes/legion_map.py
+
+import collections
+import concurrent.futures
+
+import torch
+
+from ..nodes.legion_master import LegionMasterNode
+from ..core.legion_datatypes import LEGION_CONFIG, any
+from ..helpers.worker_manager import LegionWorkerManager
+from ..helpers.campaign_progress import ProgressRelay
+from ..helpers.campaign_pipeline import CampaignPipeline
+
+
+class LegionMapNode(LegionMasterNode):
+    """
+    Data-parallel version of the Master node.
+
+    The IMAGE batch is split into shards of 'shard_size' frames; every shard is its own
+    campaign, dispatched to the least-loaded worker of the config's pool (see 'execution.pool')
+    and run with the same worker workflow. The worker workflow gets the shard on the Importer's
+    output_1 and must send the processed frames to the Exporter's input_1; extra inputs are
+    broadcast unchanged to every shard.
+
+    With 'overlap', each shard also carries up to 'overlap' neighbouring frames on both sides
+    (context for temporal models); they are trimmed away when the results are concatenated,
+    so the worker must return exactly one frame per frame received.
+
+    Shards are pipelined (see CampaignPipeline): the next ones are serialized while the workers
+    run, and finished ones are decoded in the background.
+
+    A failed shard is retried (up to 'max_retries' times) on a different worker when the pool has one.
+    """
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "legion_config": (LEGION_CONFIG,),
+                "images": ("IMAGE",),
+                "shard_size": ("INT", {"default": 100, "min": 1, "max": 100000}),
+                "overlap": ("INT", {"default": 0, "min": 0, "max": 1000}),
+                "max_retries": ("INT", {"default": 1, "min": 0, "max": 10}),
+            },
+            "optional": {
+                "input_2": (any,), "input_3": (any,), "input_4": (any,),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "map"
+
+    @staticmethod
+    def _plan_shards(total, shard_size, overlap):
+        """
+        Returns one dict per shard: the frames it owns [start, stop) and the frames
+        it is sent with [send_start, send_stop), i.e. including the overlap.
+        """
+        shards = []
+        for start in range(0, total, shard_size):
+            stop = min(start + shard_size, total)
+            shards.append({
+                "start": start,
+                "stop": stop,
+                "send_start": max(0, start - overlap),
+                "send_stop": min(total, stop + overlap),
+            })
+        return shards
+
+    @staticmethod
+    def _trim_shard(frames, shard):
+        """Drops the overlap frames from a shard's result."""
+        lead = shard["start"] - shard["send_start"]
+        trail = shard["send_stop"] - shard["stop"]
+        if lead == 0 and trail == 0:
+            return frames # No overlap: the worker may return any number of frames
+
+        sent = shard["send_stop"] - shard["send_start"]
+        if frames.shape[0] != sent:
+            raise ValueError(
+                f"Shard [{shard['start']}, {shard['stop']}) came back with {frames.shape[0]} frames for {sent} sent: "
+                f"with overlap the worker workflow must return one frame per input frame"
+            )
+        return frames[lead:lead + (shard["stop"] - shard["start"])]
+
+    def _prepare_shard(self, config, images, shard, broadcast_inputs):
+        """Serializes one shard and patches the workflow for it. Returns (campaign, file_manager, patched workflow)."""
+        local_inputs = dict(broadcast_inputs)
+        local_inputs["input_1"] = images[shard["send_start"]:shard["send_stop"]]
+        return self._prepare_campaign(config, local_inputs)
+
+    def _finish_shard(self, campaign, file_manager, shard):
+        """Reads a finished shard's frames, trimmed of the overlap, and cleans up its run directory."""
+        try:
+            if campaign.status != "COMPLETED":
+                raise RuntimeError(campaign.error or f"campaign ended as {campaign.status}")
+
+            outputs = self._load_outputs(file_manager)
+            frames = outputs.get("input_1") if outputs else None
+            if not isinstance(frames, torch.Tensor):
+                raise RuntimeError("the worker workflow returned no images on the Exporter's input_1")
+            return self._trim_shard(frames, shard)
+        finally:
+            file_manager.cleanup()
+
+    def map(self, legion_config, images, shard_size, overlap, max_retries, **kwargs):
+        shards = self._plan_shards(images.shape[0], shard_size, overlap)
+        broadcast_inputs = {key: value for key, value in kwargs.items() if value is not None and key.startswith("input_")}
+
+        print(f"\n--- [LegionPower Map] {images.shape[0]} frames in {len(shards)} shard(s) of {shard_size} (overlap {overlap}) ---")
+
+        if legion_config.get("execution.dry_run", False):
+            print("[LegionPower Map] Dry run: passing the images through.")
+            return (images,)
+
+        results = [None] * len(shards)
+        attempts = [0] * len(shards)
+        failed_ports = [set() for _ in shards]
+        pending = collections.deque(range(len(shards)))
+        pipeline = CampaignPipeline("map", CampaignPipeline.prefetch_for(legion_config))
+        preparing = collections.deque() # (shard index, prepare future), in dispatch order
+        running = {} # campaign future -> (shard index, campaign, file manager)
+        finishing = {} # finish future -> (shard index, campaign)
+        progress_bar = ProgressRelay()
+
+        try:
+            while pending or preparing or running or finishing:
+                # One shard per ready worker, so each shard lands on an idle one. While the pool
+                # can still grow, one more: a fully busy pool is what makes it scale up
+                pool = LegionWorkerManager.get_pool_status(legion_config)
+                window = max(1, pool["ready"]) + (1 if pool["ready"] < pool["max_replicas"] else 0)
+
+                # The next 'prefetch' shards are serialized while the window's shards run
+                while pending and len(preparing) + len(running) < window + pipeline.prefetch:
+                    index = pending.popleft()
+                    preparing.append((index, pipeline.prepare(self._prepare_shard, legion_config, images, shards[index], broadcast_inputs)))
+
+                while preparing and preparing[0][1].done() and len(running) < window:
+                    index, future = preparing.popleft()
+                    campaign, file_manager, patched_workflow = future.result()
+                    self._dispatch_campaign(campaign, file_manager, patched_workflow, exclude_ports=failed_ports[index])
+                    print(f"[LegionPower Map] Shard [{shards[index]['start']}, {shards[index]['stop']}) -> port {campaign.resolved_port}")
+                    pipeline.track(campaign)
+                    running[campaign.future] = (index, campaign, file_manager)
+
+                # Shards done count fully, running ones by the progress their worker reports
+                finished = sum(1 for result in results if result is not None)
+                in_flight = ProgressRelay.campaigns_fraction([campaign for _, campaign, _ in running.values()]) * len(running)
+                progress_bar.update((finished + in_flight) / len(shards))
+
+                # Wake up periodically as well, so replicas that come up meanwhile get work and the bar moves
+                waiting = list(running) + list(finishing) + ([preparing[0][1]] if preparing and not preparing[0][1].done() else [])
+                done, _ = concurrent.futures.wait(waiting, timeout=1.0, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    if future in running:
+                        index, campaign, file_manager = running.pop(future)
+                        finishing[pipeline.finish(self._finish_shard, campaign, file_manager, shards[index])] = (index, campaign)
+                    elif future in finishing:
+                        index, campaign = finishing.pop(future)
+                        shard = shards[index]
+                        try:
+                            results[index] = future.result()
+                        except Exception as e:
+                            attempts[index] += 1
+                            failed_ports[index].add(campaign.resolved_port)
+                            if attempts[index] > max_retries:
+                                raise RuntimeError(
+                                    f"Shard [{shard['start']}, {shard['stop']}) failed after {attempts[index]} attempt(s): {e}"
+                                ) from e
+
+                            print(f"[LegionPower Map] Shard [{shard['start']}, {shard['stop']}) failed on port "
+                                  f"{campaign.resolved_port} ({e}). Retrying on another worker...")
+                            pending.appendleft(index)
+        finally:
+            # On failure, take the shards in flight off their workers, then drop their data
+            if running:
+                from ..helpers.campaign_engine import LegionCampaignEngine
+                LegionCampaignEngine.get().cancel_campaigns([campaign for _, campaign, _ in running.values()])
+            pipeline.shutdown()
+            for _, future in preparing:
+                if not future.cancelled() and future.exception() is None:
+                    future.result()[1].cleanup()
+            for _, _, file_manager in running.values():
+                file_manager.cleanup()
+
+        progress_bar.update(1.0)
+        pipeline.report("[LegionPower Map]")
+        print(f"[LegionPower Map] All {len(shards)} shard(s) completed")
+        return (torch.cat(results, dim=0),)
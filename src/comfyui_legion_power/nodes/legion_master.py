@@ -1,13 +1,19 @@
 # src/comfyui_legion_power/nodes/legion_master.py
 
-import json
 from pathlib import Path
 
 # Internal imports
 from ..core.legion_datatypes import LEGION_CONFIG, LEGION_CAMPAIGN, any, LegionCampaign
 from ..helpers.worker_manager import LegionWorkerManager
 from ..helpers.file_manager import LegionFileManager
-from ..core.serializer_manager import get_serializer_for_data
+from ..helpers.blob_store import LegionBlobStore
+from ..helpers.chunk_collector import ChunkCollector
+from ..helpers.result_cache import LegionResultCache, campaign_content_key
+from ..core.content_hash import InputHashes, UnhashableData
+from ..core.serializer_manager import (
+    get_serializer_for_data, serialize_to_manifest_entry, deserialize_manifest,
+    read_manifest, write_manifest, save_exchange_options, INPUT_MANIFEST_NAME, OUTPUT_MANIFEST_NAME,
+)
 
 
 class LegionMasterNode:
@@ -51,10 +57,34 @@ class LegionMasterNode:
         if legion_campaign and hasattr(legion_campaign, 'outputs'):
             legion_campaign.outputs = None  # Release reference to old outputs
 
-        # 2. Ensure Worker is Alive
+        # Each input is hashed at most once, by the first of the result cache, content addressing and dedup that needs it
+        local_inputs = {key: value for key, value in kwargs.items() if value is not None and key.startswith("input_")}
+        input_hashes = InputHashes(local_inputs)
+
+        # 2. A sync campaign identical to one already run is answered from the result cache, without a worker
+        cache_key = None
+        if not just_warmup and not config.get("execution.dry_run", False) and not config.get("execution.asynch", False):
+            cache_key = LegionResultCache.make_key(config, input_hashes)
+            cached_outputs = LegionResultCache.load(cache_key)
+            if cached_outputs is not None:
+                print(f"[LegionPower] Result cache HIT for campaign {campaign.campaign_id} (entry {cache_key[:12]})")
+                campaign.status = "COMPLETED"
+                campaign.outputs = tuple(cached_outputs.get(f"input_{n}") for n in range(1, 13))
+                return (campaign,) + campaign.outputs
+
+        # 3. Ensure Worker is Alive (the campaign is counted as in flight on it from now on)
         LegionWorkerManager.ensure_worker_is_alive(campaign)
         campaign.status = "WARMED_UP"
 
+        try:
+            return self._execute_campaign(campaign, just_warmup, kwargs, cache_key, input_hashes)
+        finally:
+            # Once the engine has the campaign it releases the worker itself; otherwise
+            # (warmup, dry run, or a failure before submission) we do it here
+            if campaign.future is None:
+                LegionWorkerManager.release_worker(campaign)
+
+    def _execute_campaign(self, campaign, just_warmup, kwargs, cache_key=None, input_hashes=None):
         if just_warmup:
             print(f"[LegionPower] Warmup complete for campaign {campaign.campaign_id} on port {campaign.resolved_port}")
             return (campaign,) + (None,) * 12
@@ -64,34 +94,13 @@ class LegionMasterNode:
 
         print(f"\n--- [LegionPower] Preparing Campaign {campaign.campaign_id} ---")
 
-        file_manager = LegionFileManager(run_id=campaign.campaign_id)
         local_inputs = {key: value for key, value in kwargs.items() if value is not None and key.startswith("input_")}
+        if input_hashes is None:
+            input_hashes = InputHashes(local_inputs)
+        file_manager = self._new_file_manager(campaign, input_hashes)
 
-        # 4. Serialize all provided inputs and create the input manifest
-        input_manifest = {}
-        for here_arg_name, data in local_inputs.items():
-            serializer = get_serializer_for_data(data)
-            if serializer is None:
-                print(f"[LegionPower] WARNING: No serializer for input '{here_arg_name}' (type: {type(data).__name__}). Skipping.")
-                continue
-
-            print(f"[LegionPower] Serializing input '{here_arg_name}'...")
-            is_batch = getattr(serializer, 'IS_BATCH', False)
-
-            destination_path_str = file_manager.get_input_path(here_arg_name, is_batch=is_batch)
-            manifest_value = serializer.serialize(data, Path(destination_path_str))
-
-            if getattr(serializer, 'IS_PRIMITIVE', False):
-                input_manifest[here_arg_name] = {"type": getattr(serializer, 'TYPE_NAME', 'unknown'), "value": manifest_value}
-            else:
-                input_manifest[here_arg_name] = {"type": getattr(serializer, 'TYPE_NAME', 'unknown'), "path": here_arg_name}
-
-        # 5. Write the manifest file
-        manifest_path = file_manager.run_path / "inputs" / "manifest_input.json"
-        manifest_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(input_manifest, f, indent=2)
-        print(f"[LegionPower] Input manifest written to: {manifest_path}")
+        # 4-5. Serialize all provided inputs and write the input manifest
+        self._serialize_inputs(campaign, file_manager, input_hashes)
 
         if dry_run:
             print("\n--- [LegionPower] Dry Run Complete ---")
@@ -123,106 +132,52 @@ class LegionMasterNode:
             return simulated_outputs
 
         # --- REAL EXECUTION ---
-        from ..helpers.json_patcher import LegionJSONPatcher
-        from ..helpers.api_client import WorkerAPIClient
-        from ..legion_config_manager import find_file_in_roots
+        from ..helpers.campaign_engine import LegionCampaignEngine, wait_for_campaigns
 
         # 6. Load and patch the workflow
-        workflow_filename = campaign.config.get("workflow")
-        if not workflow_filename:
-            raise ValueError("No workflow specified in legion config!")
-
-        workflow_path = find_file_in_roots(workflow_filename, "paths.workflows_roots")
-        patcher = LegionJSONPatcher(workflow_path)
-
-        # Find the LegionImporter node and patch its data_exchange_root
-        importer_node_id = None
-        for node_id, node_data in patcher.workflow.items():
-            if node_data.get("class_type") == "LegionImporter":
-                importer_node_id = node_id
-                break
-
-        if not importer_node_id:
-            raise ValueError(f"Workflow '{workflow_filename}' must contain a 'LegionImporter' node!")
-
-        # Patch the data_exchange_root value
-        data_exchange_root_path = str(file_manager.run_path.resolve())
-        patcher.patch(f"{importer_node_id}.inputs.data_exchange_root", data_exchange_root_path)
-
-        patched_workflow = patcher.get_patched_workflow()
+        patched_workflow = self._prepare_workflow(campaign, file_manager)
 
         # 7. Determine execution mode (sync vs async)
         is_async = campaign.config.get("execution.asynch", False)
 
         if is_async:
-            # Async mode: start thread and return immediately with None outputs
+            # Async mode: hand the campaign to the engine and return immediately
             print(f"[LegionPower] Starting ASYNC execution on port {campaign.resolved_port}...")
 
-            def async_callback(result):
-                if "error" in result:
-                    print(f"[LegionPower] ASYNC execution FAILED: {result['error']}")
-                    campaign.status = "FAILED"
-                else:
-                    print(f"[LegionPower] ASYNC execution COMPLETED for campaign {campaign.campaign_id}")
-                    campaign.status = "COMPLETED"
-
-            thread = WorkerAPIClient.submit_workflow_async(
-                campaign.resolved_port,
-                patched_workflow,
-                async_callback
-            )
-
-            campaign.execution_thread = thread
-            campaign.status = "EXECUTING_ASYNC"
+            future = LegionCampaignEngine.get().submit_campaign(campaign, patched_workflow, status="EXECUTING_ASYNC")
+            file_manager.release_when_done(future) # The Join may never run
 
             # Return error message instead of None to help users understand they need Join
             error_msg = "ERROR: async is True! Get the outputs from a 'Legion: Join' node, please!"
             return (campaign,) + (error_msg,) * 12
 
         else:
-            # Sync mode: block until completion
+            # Sync mode: block until completion (still scheduled by the engine, so concurrency caps apply)
             print(f"[LegionPower] Starting SYNC execution on port {campaign.resolved_port}...")
 
             try:
-                api_result = WorkerAPIClient.submit_workflow_sync(
-                    campaign.resolved_port,
-                    patched_workflow
-                )
+                future = LegionCampaignEngine.get().submit_campaign(campaign, patched_workflow)
+
+                # Chunked outputs are decoded while the worker is still writing the rest
+                collector = None
+                if campaign.config.get("data_exchange.chunk_size"):
+                    collector = ChunkCollector(file_manager.run_path / "outputs")
+                try:
+                    wait_for_campaigns([campaign]) # Relays the worker's progress to this node's progress bar
+                finally:
+                    if collector is not None:
+                        collector.stop()
+                api_result = future.result()
 
                 campaign.status = "COMPLETED"
                 print(f"[LegionPower] SYNC execution COMPLETED for campaign {campaign.campaign_id}")
 
                 # 8. Deserialize outputs
-                output_manifest_path = file_manager.run_path / "outputs" / "manifest_output.json"
+                deserialized_outputs = self._load_outputs(file_manager, collector)
 
-                if not output_manifest_path.exists():
-                    print(f"[LegionPower] WARNING: Output manifest not found at {output_manifest_path}")
+                if deserialized_outputs is None:
                     final_outputs = (campaign,) + (None,) * 12
                 else:
-                    with open(output_manifest_path, 'r', encoding='utf-8') as f:
-                        output_manifest = json.load(f)
-
-                    deserialized_outputs = {}
-                    from ..core.serializer_manager import SERIALIZER_CLASSES
-                    serializer_map = {s.TYPE_NAME: s for s in SERIALIZER_CLASSES}
-
-                    for name, info in output_manifest.items():
-                        serializer_type = info.get("type")
-
-                        if serializer_type not in serializer_map:
-                            print(f"[LegionPower] WARNING: Unknown serializer type '{serializer_type}' for output '{name}'")
-                            continue
-
-                        deserializer = serializer_map[serializer_type]()
-
-                        if "value" in info:
-                            # Primitive type
-                            deserialized_outputs[name] = deserializer.deserialize(info["value"])
-                        elif "path" in info:
-                            # File-based type
-                            source_path = file_manager.run_path / "outputs" / info["path"]
-                            deserialized_outputs[name] = deserializer.deserialize(str(source_path.resolve()))
-
                     final_outputs = (
                         campaign,
                         deserialized_outputs.get("input_1"),  # Note: exporter uses input_X naming
@@ -243,6 +198,13 @@ class LegionMasterNode:
                     # This allows Join to retrieve outputs even after cleanup
                     campaign.outputs = final_outputs[1:]  # Exclude campaign itself from outputs
 
+                    # Keep the outputs for identical campaigns (moved out of the run directory before cleanup)
+                    try:
+                        # A content-addressed run directory keeps its outputs: the worker may answer its next identical prompt from its cache
+                        LegionResultCache.store(cache_key, file_manager.run_path / "outputs", move=not file_manager.content_addressed)
+                    except Exception as e:
+                        print(f"[LegionPower] WARNING: Could not store the outputs in the result cache: {e}")
+
                 # Cleanup
                 file_manager.cleanup()
 
@@ -251,10 +213,176 @@ class LegionMasterNode:
             except Exception as e:
                 campaign.status = "FAILED"
                 print(f"[LegionPower] ERROR during execution: {e}")
+                if file_manager.content_addressed:
+                    file_manager.cleanup() # Only releases it: a shared directory is not left behind for inspection
+                else:
+                    # The run directory stays for inspection, but shared memory segments would hold RAM until reboot
+                    file_manager._release_shared_memory()
                 import traceback
                 traceback.print_exc()
                 raise
 
+    # --- Building blocks shared with the other campaign-driving nodes (e.g. Legion: Map) ---
+
+    @staticmethod
+    def _new_file_manager(campaign, input_hashes):
+        """
+        Returns the file manager of the run directory of a campaign with the inputs of 'input_hashes'
+        (an InputHashes) and records its path in the campaign.
+        With 'data_exchange.content_addressed', campaigns with the same workflow, worker and inputs
+        share one directory, so the worker receives the very same prompt and can reuse its cached results.
+        A campaign whose directory is in use by a running one gets a private directory instead.
+        """
+        file_manager = None
+        if campaign.config.get("data_exchange.content_addressed", False):
+            if campaign.config.get("data_exchange.format") == "shm":
+                print("[LegionPower] WARNING: data_exchange.content_addressed is ignored with format 'shm' (segments do not outlive a run)")
+            else:
+                content_key = campaign_content_key(campaign.config, input_hashes)
+                if content_key is not None:
+                    file_manager = LegionFileManager.for_content(content_key, campaign.campaign_id)
+
+        if file_manager is None:
+            file_manager = LegionFileManager(run_id=campaign.campaign_id)
+
+        campaign.run_path = str(file_manager.run_path)
+        return file_manager
+
+    @staticmethod
+    def _serialize_inputs(campaign, file_manager, input_hashes):
+        """
+        Serializes the inputs of 'input_hashes' (an InputHashes over name -> data) into the
+        campaign's run directory and writes the input manifest. Returns the manifest.
+        A content-addressed directory that already holds its inputs is reused as is.
+        """
+        if file_manager.content_addressed:
+            with file_manager.content_lock:
+                manifest_path = file_manager.run_path / "inputs" / INPUT_MANIFEST_NAME
+                if manifest_path.exists():
+                    print(f"[LegionPower] Reusing the inputs already in {file_manager.run_path}")
+                    return read_manifest(manifest_path)
+                return LegionMasterNode._write_inputs(campaign, file_manager, input_hashes)
+
+        return LegionMasterNode._write_inputs(campaign, file_manager, input_hashes)
+
+    @staticmethod
+    def _write_inputs(campaign, file_manager, input_hashes):
+        # Data exchange options (e.g. transport format) travel with the campaign, so the Exporter matches them
+        exchange_options = campaign.config.get("data_exchange") or {}
+        save_exchange_options(file_manager.run_path, exchange_options)
+
+        input_manifest = {}
+        for here_arg_name, data in input_hashes.inputs.items():
+            serializer = get_serializer_for_data(data, exchange_options)
+            if serializer is None:
+                print(f"[LegionPower] WARNING: No serializer for input '{here_arg_name}' (type: {type(data).__name__}). Skipping.")
+                continue
+
+            print(f"[LegionPower] Serializing input '{here_arg_name}'...")
+            is_batch = getattr(serializer, 'IS_BATCH', False)
+
+            destination_path_str = file_manager.get_input_path(here_arg_name, is_batch=is_batch)
+
+            # The same payload sent by several campaigns is serialized once and hardlinked
+            entry = None
+            if LegionBlobStore.is_enabled():
+                try:
+                    content_hash = input_hashes.get(here_arg_name)
+                except UnhashableData:
+                    content_hash = None # Nothing to deduplicate it against
+                if content_hash is not None:
+                    entry = LegionBlobStore.serialize_input(
+                        serializer, data, Path(destination_path_str), here_arg_name, file_manager.run_path, exchange_options,
+                        content_hash=content_hash,
+                    )
+            if entry is None:
+                entry = serialize_to_manifest_entry(serializer, data, Path(destination_path_str), here_arg_name)
+            input_manifest[here_arg_name] = entry
+
+        manifest_path = file_manager.run_path / "inputs" / INPUT_MANIFEST_NAME
+        write_manifest(manifest_path, input_manifest)
+        print(f"[LegionPower] Input manifest written to: {manifest_path}")
+        return input_manifest
+
+    @staticmethod
+    def _prepare_workflow(campaign, file_manager):
+        """
+        Loads the campaign's worker workflow and points its LegionImporter at the run directory.
+        Returns the patched workflow JSON.
+        """
+        from ..helpers.json_patcher import WorkflowRegistry
+
+        workflow_filename = campaign.config.get("workflow")
+        if not workflow_filename:
+            raise ValueError("No workflow specified in legion config!")
+
+        # Parsed once and shared: each campaign patches its own copy-on-write instance
+        template = WorkflowRegistry.find(workflow_filename)
+
+        if not template.importer_node_ids:
+            raise ValueError(f"Workflow '{workflow_filename}' must contain a 'LegionImporter' node!")
+
+        # Patch the data_exchange_root value of the LegionImporter node
+        data_exchange_root_path = str(file_manager.run_path.resolve())
+        patcher = template.new_patcher()
+        patcher.patch(f"{template.importer_node_ids[0]}.inputs.data_exchange_root", data_exchange_root_path)
+
+        return patcher.get_patched_workflow()
+
+    @staticmethod
+    def _prepare_campaign(config, local_inputs):
+        """
+        Creates a campaign, serializes 'local_inputs' for it and patches its workflow.
+        No worker is chosen (the run directory does not depend on it), so this can run ahead,
+        on another thread, of _dispatch_campaign. Returns (campaign, file_manager, patched workflow).
+        """
+        campaign = LegionCampaign(config=config)
+        input_hashes = InputHashes(local_inputs)
+        file_manager = LegionMasterNode._new_file_manager(campaign, input_hashes)
+        try:
+            LegionMasterNode._serialize_inputs(campaign, file_manager, input_hashes)
+            return campaign, file_manager, LegionMasterNode._prepare_workflow(campaign, file_manager)
+        except Exception:
+            file_manager.cleanup()
+            raise
+
+    @staticmethod
+    def _dispatch_campaign(campaign, file_manager, patched_workflow, exclude_ports=None):
+        """
+        Sends a prepared campaign to a worker (see ensure_worker_is_alive for 'exclude_ports').
+        On failure its worker is released and its run directory cleaned up.
+        """
+        from ..helpers.campaign_engine import LegionCampaignEngine
+
+        try:
+            LegionWorkerManager.ensure_worker_is_alive(campaign, exclude_ports=exclude_ports)
+            LegionCampaignEngine.get().submit_campaign(campaign, patched_workflow)
+        except Exception:
+            if campaign.future is None:
+                LegionWorkerManager.release_worker(campaign)
+            file_manager.cleanup()
+            raise
+
+    @staticmethod
+    def _load_outputs(file_manager, collector=None):
+        """
+        Deserializes the worker's output manifest. Returns None if the worker wrote none.
+        Chunked outputs already decoded by 'collector' (a stopped ChunkCollector) are taken from it.
+        """
+        output_manifest_path = file_manager.run_path / "outputs" / OUTPUT_MANIFEST_NAME
+
+        if not output_manifest_path.exists():
+            print(f"[LegionPower] WARNING: Output manifest not found at {output_manifest_path}")
+            return None
+
+        output_manifest = read_manifest(output_manifest_path)
+        collected = collector.take_all(output_manifest) if collector is not None else {}
+
+        remaining = {name: info for name, info in output_manifest.items() if name not in collected}
+        deserialized = deserialize_manifest(remaining, file_manager.run_path / "outputs")
+        deserialized.update(collected)
+        return deserialized
+
 
 class LegionMasterNode3(LegionMasterNode):
     @classmethod
@@ -0,0 +1,168 @@
+# src/comfyui_legion_power/nodes/legion_master_batch.py
+
+import collections
+import concurrent.futures
+
+from ..nodes.legion_master import LegionMasterNode
+from ..core.legion_datatypes import LEGION_CONFIG, LEGION_CAMPAIGN, any, LegionCampaign
+from ..helpers.worker_manager import LegionWorkerManager
+from ..helpers.campaign_pipeline import CampaignPipeline
+from ..helpers.campaign_progress import ProgressRelay, PROGRESS_REFRESH_INTERVAL
+
+
+class LegionMasterBatchNode(LegionMasterNode):
+    """
+    List/batch mode of the Master node.
+
+    Every input is taken as a list (ComfyUI list inputs); item i of each list forms one
+    campaign, and single-item lists are shared by all items. Items are pipelined (see
+    CampaignPipeline): while the worker runs one, the next ones ('execution.pipeline.prefetch')
+    are serialized and already queued, and finished ones are deserialized in the background.
+    Results come back as lists, in item order.
+
+    Batch mode always waits for its items: 'execution.asynch' is ignored.
+    """
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,) * 13
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "optional": {
+                "legion_config": (LEGION_CONFIG,),
+                "legion_campaign": (LEGION_CAMPAIGN,),
+                "input_1": (any,), "input_2": (any,), "input_3": (any,),
+                "input_4": (any,), "input_5": (any,), "input_6": (any,),
+                "input_7": (any,), "input_8": (any,), "input_9": (any,),
+                "input_10": (any,), "input_11": (any,), "input_12": (any,),
+            }
+        }
+
+    RETURN_TYPES = (LEGION_CAMPAIGN, any, any, any, any, any, any, any, any, any, any, any, any)
+    RETURN_NAMES = ("legion_campaigns", "output_1", "output_2", "output_3", "output_4", "output_5", "output_6", "output_7", "output_8", "output_9", "output_10", "output_11", "output_12")
+    FUNCTION = "execute_batch"
+
+    @staticmethod
+    def _split_items(kwargs):
+        """
+        Turns {name: [values]} into one {name: value} dict per item.
+        Lists must have either one value (shared) or the same length as the longest list.
+        """
+        lists = {key: value for key, value in kwargs.items() if key.startswith("input_") and value is not None}
+        count = max((len(values) for values in lists.values()), default=0)
+
+        for key, values in lists.items():
+            if len(values) not in (1, count):
+                raise ValueError(f"Batch Master: '{key}' has {len(values)} items, expected 1 or {count}")
+
+        items = []
+        for i in range(count):
+            item = {}
+            for key, values in lists.items():
+                value = values[i] if len(values) > 1 else values[0]
+                if value is not None:
+                    item[key] = value
+            items.append(item)
+        return items
+
+    def execute_batch(self, legion_config=None, legion_campaign=None, **kwargs):
+        legion_config = legion_config[0] if legion_config else None
+        legion_campaign = legion_campaign[0] if legion_campaign else None
+
+        err_root = "Batch Master Node requires either a 'legion_config' or a 'legion_campaign' input"
+        if legion_config is None and legion_campaign is None:
+            raise ValueError(f"{err_root}.")
+        if legion_config is not None and legion_campaign is not None:
+            raise ValueError(f"{err_root}, not both!")
+
+        config = legion_campaign.config if legion_campaign else legion_config
+        items = self._split_items(kwargs)
+
+        print(f"\n--- [LegionPower Batch] Preparing {len(items)} item(s) ---")
+
+        if config.get("execution.dry_run", False):
+            print("[LegionPower Batch] Dry run: passing the inputs through.")
+            campaigns = []
+            for _ in items:
+                campaign = LegionCampaign(config=config)
+                campaign.status = "DRY_RUN_COMPLETE"
+                campaigns.append(campaign)
+            outputs = [[item.get(f"input_{n}") for item in items] for n in range(1, 13)]
+            return (campaigns, *outputs)
+
+        pipeline = CampaignPipeline("batch", CampaignPipeline.prefetch_for(config))
+        pending = collections.deque(enumerate(items))
+        preparing = collections.deque() # (item index, prepare future), in item order
+        running = {} # campaign future -> (item index, campaign, file manager)
+        finishing = {} # finish future -> (item index, campaign)
+        campaigns = [None] * len(items)
+        progress_bar = ProgressRelay()
+
+        try:
+            while pending or preparing or running or finishing:
+                # Items between the start of their serialization and the end of their cleanup:
+                # one per ready worker, plus 'prefetch' prepared ahead so no worker waits for its next prompt
+                pool = LegionWorkerManager.get_pool_status(config)
+                depth = max(1, pool["ready"]) + pipeline.prefetch
+                while pending and len(preparing) + len(running) + len(finishing) < depth:
+                    index, item = pending.popleft()
+                    preparing.append((index, pipeline.prepare(self._prepare_campaign, config, item)))
+
+                # Prepared items go to the workers in item order
+                while preparing and preparing[0][1].done():
+                    index, future = preparing.popleft()
+                    campaign, file_manager, patched_workflow = future.result()
+                    self._dispatch_campaign(campaign, file_manager, patched_workflow)
+                    pipeline.track(campaign)
+                    running[campaign.future] = (index, campaign, file_manager)
+
+                finished = sum(1 for campaign in campaigns if campaign is not None)
+                in_flight = ProgressRelay.campaigns_fraction([campaign for _, campaign, _ in running.values()]) * len(running)
+                progress_bar.update((finished + in_flight) / len(items))
+
+                waiting = list(running) + list(finishing) + ([preparing[0][1]] if preparing and not preparing[0][1].done() else [])
+                done, _ = concurrent.futures.wait(waiting, timeout=PROGRESS_REFRESH_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    if future in running:
+                        index, campaign, file_manager = running.pop(future)
+                        finishing[pipeline.finish(self._finish_item, campaign, file_manager)] = (index, campaign)
+                    elif future in finishing:
+                        index, campaign = finishing.pop(future)
+                        if campaign.status != "COMPLETED":
+                            raise RuntimeError(
+                                f"Batch item {index + 1} of {len(items)} failed "
+                                f"(campaign {campaign.campaign_id}): {campaign.error}"
+                            )
+                        future.result() # Raises if its outputs could not be read
+                        campaigns[index] = campaign
+
+            outputs = [[] for _ in range(12)]
+            for campaign in campaigns:
+                for n, value in enumerate(campaign.outputs):
+                    outputs[n].append(value)
+
+            progress_bar.update(1.0)
+            pipeline.report("[LegionPower Batch]")
+            print(f"[LegionPower Batch] All {len(items)} item(s) completed")
+            return (campaigns, *outputs)
+        finally:
+            # On failure, take the items in flight off their workers, then drop their data
+            if running:
+                from ..helpers.campaign_engine import LegionCampaignEngine
+                LegionCampaignEngine.get().cancel_campaigns([campaign for _, campaign, _ in running.values()])
+            pipeline.shutdown()
+            for _, future in preparing:
+                if not future.cancelled() and future.exception() is None:
+                    future.result()[1].cleanup()
+            for _, _, file_manager in running.values():
+                file_manager.cleanup()
+
+    def _finish_item(self, campaign, file_manager):
+        """Finish stage of an item: reads its outputs into campaign.outputs (if it completed) and cleans up."""
+        try:
+            if campaign.status == "COMPLETED":
+                deserialized_outputs = self._load_outputs(file_manager) or {}
+                campaign.outputs = tuple(deserialized_outputs.get(f"input_{n}") for n in range(1, 13))
+        finally:
+            file_manager.cleanup()